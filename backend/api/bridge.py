@@ -1,8 +1,12 @@
 """API bridge for pywebview - exposes backend functionality to frontend."""
 
-import subprocess
 import sys
 import os
+import threading
+import uuid
+from collections import defaultdict
+from functools import cache
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Optional
@@ -13,17 +17,54 @@ from database.repositories.products import ProductRepository, Product
 from database.repositories.invoices import InvoiceRepository, Invoice, InvoiceItem
 from database.repositories.settings import SettingsRepository
 from database.repositories.audit import AuditRepository
+from database.repositories.email_queue import EmailQueueRepository
 from core.hash_chain import HashChain
+from core.money import to_cents, from_cents, rate_to_basis_points, vat_cents
 from core.qr_generator import QRGenerator
 from core.qr_validator import QRValidator
 from core.keyboard_mapper import KeyboardMapper
-from services.printer import ThermalPrinter, PrinterNotConnectedError
+from services.printer import ThermalPrinter, PrinterNotConnectedError, list_usb_printer_ports
 from services.pdf_generator import PDFGenerator
 from services.email_service import EmailService, EmailConfig
 from services.csv_importer import CSVImporter
 from services.reports import ReportsService
 
 
+def _now_timestamps() -> tuple[str, str, int]:
+    """
+    Return the current local time as (stored, compact, unix) values.
+
+    All come from one datetime.now() call. The stored form is the one
+    invoices keep in created_at and hash; the compact form is used in ids
+    and the Unix seconds in QR data.
+    """
+    now = datetime.now()
+    return (
+        now.strftime('%Y-%m-%d %H:%M:%S'),
+        now.strftime('%Y%m%d%H%M%S'),
+        int(now.timestamp())
+    )
+
+
+@cache
+def _user_data_dir(name: str) -> Path:
+    """
+    Resolve and create a subdirectory of the user's OpenInvoice data folder.
+
+    Cached, so the environment lookup and mkdir run once per process.
+    """
+    if sys.platform == 'win32':
+        base = Path(os.environ.get('APPDATA', Path.home()))
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Application Support'
+    else:
+        base = Path(os.environ.get('XDG_DATA_HOME', Path.home() / '.local' / 'share'))
+
+    data_dir = base / 'OpenInvoice' / name
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
 class API:
     """
     API class exposed to frontend via pywebview.
@@ -41,9 +82,11 @@ class API:
         self.invoices = InvoiceRepository(self.db)
         self.settings = SettingsRepository(self.db)
         self.audit = AuditRepository(self.db)
+        self.email_queue = EmailQueueRepository(self.db)
 
         # Set up PDF output directory in user data folder
         pdf_output_dir = self._get_pdf_output_dir()
+        self.reports_output_dir = self._get_user_data_dir('reports')
 
         # Services
         self.qr_generator = QRGenerator()
@@ -51,25 +94,96 @@ class API:
         self.printer = ThermalPrinter()
         self.pdf_generator = PDFGenerator(output_dir=pdf_output_dir)
         self.email_service = EmailService()
+        self._smtp_cfg: Optional[EmailConfig] = None
         self.csv_importer = CSVImporter(self.products)
         self.reports = ReportsService(self.db)
 
+        # Background jobs (PDF rendering, email delivery)
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='api-job')
+        self._jobs: dict[str, Future] = {}
+        # pywebview runs each call on its own thread; guards every _jobs access
+        self._jobs_lock = threading.Lock()
+        self._resume_email_queue()
+
+    def shutdown(self) -> None:
+        """Flush pending background work before the application exits."""
+        # Queued jobs still run (they are short), so receipts from the last
+        # checkouts get their PDF before the process exits
+        self._pool.shutdown(wait=True, cancel_futures=False)
+        self.audit.flush()
+
+    # Finished jobs nobody polled (e.g. automatic receipt PDFs) are kept
+    # until this many jobs are tracked, then dropped
+    MAX_TRACKED_JOBS = 100
+
+    def _start_job(self, func, *args, **kwargs) -> str:
+        """Run func on the job pool and return the id to poll it with."""
+        job_id = uuid.uuid4().hex
+        future = self._pool.submit(func, *args, **kwargs)
+        with self._jobs_lock:
+            if len(self._jobs) >= self.MAX_TRACKED_JOBS:
+                for finished in [key for key, tracked in self._jobs.items() if tracked.done()]:
+                    del self._jobs[finished]
+            self._jobs[job_id] = future
+        return job_id
+
+    def _submit_job(self, func, *args) -> dict:
+        """Run func(*args) on the job pool and return its job id."""
+        return self._response(True, {'job_id': self._start_job(func, *args)})
+
+    def _job_status(self, job_id: str) -> dict:
+        """
+        Report the state of a background job.
+
+        Once a job is done its result is returned and the job is forgotten.
+        """
+        with self._jobs_lock:
+            future = self._jobs.get(job_id)
+            if future is None:
+                return self._response(False, error="Job not found")
+            if not future.done():
+                return self._response(True, {'done': False})
+            del self._jobs[job_id]
+
+        try:
+            result = future.result()
+        except Exception as e:
+            result = self._response(False, error=str(e))
+        return self._response(True, {
+            'done': True,
+            'success': result['success'],
+            'result': result.get('data'),
+            'error': result.get('error'),
+        })
+
     def _get_pdf_output_dir(self) -> Path:
         """Get the directory for storing PDF receipts."""
-        if sys.platform == 'win32':
-            base = Path(os.environ.get('APPDATA', Path.home()))
-        elif sys.platform == 'darwin':
-            base = Path.home() / 'Library' / 'Application Support'
-        else:
-            base = Path(os.environ.get('XDG_DATA_HOME', Path.home() / '.local' / 'share'))
+        return self._get_user_data_dir('receipts')
+
+    def _get_user_data_dir(self, name: str) -> Path:
+        """Get (and create) a subdirectory of the user's OpenInvoice data folder."""
+        return _user_data_dir(name)
 
-        pdf_dir = base / 'OpenInvoice' / 'receipts'
-        pdf_dir.mkdir(parents=True, exist_ok=True)
-        return pdf_dir
+    def _get_email_service(self) -> EmailService:
+        """Return the email service configured from cached SMTP settings."""
+        if self._smtp_cfg is None:
+            self._smtp_cfg = EmailConfig.from_dict(self.settings.get_smtp_config())
+            self.email_service.set_config(self._smtp_cfg)
+        return self.email_service
 
     def _response(self, success: bool, data: Any = None, error: str = None) -> dict:
-        """Create standardized API response."""
-        return {'success': success, 'data': data, 'error': error}
+        """
+        Create standardized API response.
+
+        data and error are left out when None, keeping the payload that
+        crosses the webview bridge as small as possible.
+        """
+        response = {'success': success}
+        if data is not None:
+            response['data'] = data
+        if error is not None:
+            response['error'] = error
+        return response
 
     def get_receipts_directory(self) -> dict:
         """Get the directory where PDF receipts are saved."""
@@ -123,8 +237,12 @@ class API:
     def products_create(self, data: dict) -> dict:
         """Create a new product."""
         try:
+            product_id = data.get('id')
+            if not product_id:
+                _, compact, _ = _now_timestamps()
+                product_id = f"PROD-{compact}"
             product = Product(
-                id=data.get('id') or f"PROD-{datetime.now().strftime('%Y%m%d%H%M%S')}",
+                id=product_id,
                 name=data['name'],
                 description=data.get('description', ''),
                 price=float(data['price']),
@@ -195,170 +313,221 @@ class API:
             seller_id = self.settings.seller_id
             currency_symbol = self.settings.currency_symbol
 
-            # Calculate totals and build invoice items
-            invoice_items = []
-            subtotal = 0
-            vat_total = 0
-
-            for item_data in items:
-                product = self.products.get_by_id(item_data['product_id'])
-                if not product:
-                    return self._response(False, error=f"Product {item_data['product_id']} not found")
-
-                quantity = int(item_data['quantity'])
-                line_total = product.price * quantity
-                vat_amount = line_total * (product.vat_rate / 100)
+            # Fetch all products in one query, then build invoice items
+            products = self.products.get_by_ids([item['product_id'] for item in items])
+
+            # Report every unknown product at once rather than the first only
+            missing = list(dict.fromkeys(
+                item['product_id'] for item in items if item['product_id'] not in products
+            ))
+            if len(missing) == 1:
+                return self._response(False, error=f"Product {missing[0]} not found")
+            if missing:
+                return self._response(False, error=f"Products not found: {', '.join(map(str, missing))}")
+
+            # One (product, quantity, unit price in cents) tuple per line
+            ordered = [
+                (products[item_data['product_id']], int(item_data['quantity']))
+                for item_data in items
+            ]
+            lines = [(product, quantity, to_cents(product.price)) for product, quantity in ordered]
+
+            # Amounts are summed in integer cents; VAT is accumulated exactly
+            # (cents x basis points) and rounded once for the whole invoice
+            subtotal_cents = sum(price_cents * quantity for _, quantity, price_cents in lines)
+            vat_weighted = sum(
+                price_cents * quantity * rate_to_basis_points(product.vat_rate)
+                for product, quantity, price_cents in lines
+            )
 
-                subtotal += line_total
-                vat_total += vat_amount
+            stock_deltas = defaultdict(int)
+            for product, quantity, _ in lines:
+                stock_deltas[product.id] -= quantity
 
-                invoice_items.append(InvoiceItem(
+            invoice_items = [
+                InvoiceItem(
                     product_id=product.id,
                     product_name=product.name,
                     quantity=quantity,
-                    unit_price=product.price,
+                    unit_price=from_cents(price_cents),
                     vat_rate=product.vat_rate,
-                    line_total=line_total
-                ))
-
-            total = subtotal + vat_total
-
-            # Get previous hash for chain
-            previous_hash = self.invoices.get_latest_hash()
-
-            # Generate invoice number
-            invoice_number = self.invoices.get_next_invoice_number()
-            # Use consistent timestamp format that won't be modified by SQLite
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # Calculate hash
-            current_hash = HashChain.calculate_hash(
-                invoice_number=invoice_number,
-                seller_id=seller_id,
-                total=total,
-                items=[item.to_dict() for item in invoice_items],
-                timestamp=timestamp,
-                previous_hash=previous_hash
-            )
+                    line_total=from_cents(price_cents * quantity)
+                )
+                for product, quantity, price_cents in lines
+            ]
 
-            # Generate QR code
-            qr_data, qr_image = self.qr_generator.generate_for_invoice(
-                invoice_number=invoice_number,
-                total=total,
-                hash_value=current_hash,
-                timestamp=timestamp
-            )
+            vat_total_cents = vat_cents(vat_weighted)
+            subtotal = from_cents(subtotal_cents)
+            vat_total = from_cents(vat_total_cents)
+            total = from_cents(subtotal_cents + vat_total_cents)
+            # Serialized once; shared by the hash and the saved PDF
+            item_dicts = [item.to_dict() for item in invoice_items]
+
+            # Chain lookup, insert, stock and audit commit together
+            with self.db.transaction():
+                # Get previous hash for chain
+                previous_hash = self.invoices.get_latest_hash()
+
+                # Generate invoice number
+                invoice_number = self.invoices.get_next_invoice_number()
+                # Use consistent timestamp format that won't be modified by SQLite
+                timestamp, _, unix_ts = _now_timestamps()
+
+                # Calculate hash
+                current_hash = HashChain.calculate_hash(
+                    invoice_number=invoice_number,
+                    seller_id=seller_id,
+                    total=total,
+                    items=item_dicts,
+                    timestamp=timestamp,
+                    previous_hash=previous_hash
+                )
 
-            # Create invoice
-            invoice = Invoice(
-                invoice_number=invoice_number,
-                seller_id=seller_id,
-                store_name=store_name,
-                subtotal=round(subtotal, 2),
-                vat_amount=round(vat_total, 2),
-                total=round(total, 2),
-                payment_method=payment_method,
-                customer_email=customer_email,
-                previous_hash=previous_hash,
-                current_hash=current_hash,
-                qr_data=qr_data,
-                created_at=timestamp,
-                items=invoice_items
-            )
+                # Generate QR payload; the image is rendered after commit so
+                # the write lock isn't held for the PNG encoding
+                qr_data = self.qr_generator.generate_qr_data(
+                    invoice_number, total, current_hash, unix_ts
+                )
+
+                # Update product stock
+                self.products.update_stock_bulk(stock_deltas)
+
+                # Create invoice
+                invoice = Invoice(
+                    invoice_number=invoice_number,
+                    seller_id=seller_id,
+                    store_name=store_name,
+                    subtotal=subtotal,
+                    vat_amount=vat_total,
+                    total=total,
+                    payment_method=payment_method,
+                    customer_email=customer_email,
+                    previous_hash=previous_hash,
+                    current_hash=current_hash,
+                    qr_data=qr_data,
+                    created_at=timestamp,
+                    items=invoice_items
+                )
 
-            created = self.invoices.create(invoice)
+                created = self.invoices.create(invoice)
 
-            # Update product stock
-            for item_data in items:
-                self.products.update_stock(item_data['product_id'], -int(item_data['quantity']))
+                # Log creation
+                self.audit.log_invoice_created(invoice_number, total)
 
-            # Log creation
-            self.audit.log_invoice_created(invoice_number, total)
+            qr_image = self._ensure_qr_image(created)
 
-            # Generate and save PDF automatically
-            pdf_path = None
-            try:
-                pdf_path = self.pdf_generator.save_receipt_pdf(
+            # Save the PDF automatically, in the background, unless turned off
+            # in settings (generate_pdf stays available on demand); the
+            # frontend can poll generate_pdf_status(pdf_job_id)
+            pdf_job_id = None
+            if self.settings.auto_save_pdf:
+                pdf_job_id = self._start_job(
+                    self._save_pdf,
                     invoice_number=invoice_number,
                     store_name=store_name,
                     seller_id=seller_id,
-                    items=[item.to_dict() for item in invoice_items],
-                    subtotal=round(subtotal, 2),
-                    vat_amount=round(vat_total, 2),
-                    total=round(total, 2),
+                    items=item_dicts,
+                    subtotal=subtotal,
+                    vat_amount=vat_total,
+                    total=total,
                     payment_method=payment_method,
                     qr_base64=qr_image,
                     currency_symbol=currency_symbol,
                     timestamp=timestamp,
                     customer_email=customer_email
                 )
-            except Exception:
-                pass  # Don't fail invoice creation if PDF fails
 
-            # Add QR image to response
             response_data = created.to_dict()
             response_data['qr_image'] = qr_image
             response_data['currency_symbol'] = currency_symbol
-            if pdf_path:
-                response_data['pdf_path'] = str(pdf_path)
+            response_data['pdf_path'] = None
+            response_data['pdf_pending'] = pdf_job_id is not None
+            response_data['pdf_job_id'] = pdf_job_id
 
             return self._response(True, response_data)
 
         except Exception as e:
             return self._response(False, error=str(e))
 
-    def invoices_get_by_number(self, invoice_number: str) -> dict:
-        """Get invoice by number."""
+    def invoices_get_by_number(self, invoice_number: str, client_hash: str = None) -> dict:
+        """
+        Get invoice by number.
+
+        Args:
+            invoice_number: Invoice number
+            client_hash: current_hash of the copy the caller already holds;
+                when it matches, qr_image is left out and qr_unchanged is set
+        """
         try:
             invoice = self.invoices.get_by_number(invoice_number)
             if invoice:
+                unchanged = client_hash is not None and client_hash == invoice.current_hash
+                if unchanged:
+                    invoice.qr_image = None
+                else:
+                    self._ensure_qr_image(invoice)
                 data = invoice.to_dict()
-                # Regenerate QR image for display
-                _, qr_image = self.qr_generator.generate_for_invoice(
-                    invoice_number=invoice.invoice_number,
-                    total=invoice.total,
-                    hash_value=invoice.current_hash,
-                    timestamp=invoice.created_at
-                )
-                data['qr_image'] = qr_image
+                data['qr_image'] = invoice.qr_image
+                if unchanged:
+                    data['qr_unchanged'] = True
                 return self._response(True, data)
             return self._response(False, error="Invoice not found")
         except Exception as e:
             return self._response(False, error=str(e))
 
+    def _ensure_qr_image(self, invoice: Invoice) -> str:
+        """
+        Return the stored QR image for an invoice.
+
+        Invoices created before the image was persisted get it rendered
+        once here and written back, so later reads skip the encoding.
+        """
+        if not invoice.qr_image:
+            # Encode the stored payload as-is rather than rebuilding it from
+            # the invoice fields, so the image always matches qr_data
+            invoice.qr_image = self.qr_generator.generate_qr_base64(invoice.qr_data)
+            self.invoices.set_qr_image(invoice.id, invoice.qr_image)
+        return invoice.qr_image
+
     def invoices_process_return(self, invoice_number: str, item_ids: list[int]) -> dict:
         """Process return for specific items."""
         try:
-            invoice = self.invoices.get_by_number(invoice_number)
-            if not invoice:
-                return self._response(False, error="Invoice not found")
-
-            refund_amount = 0
-
-            for item in invoice.items:
-                if item.id in item_ids:
-                    if item.return_status == 'returned':
-                        return self._response(False, error=f"Item {item.id} already returned")
-
-                    # Mark as returned
-                    self.invoices.mark_item_returned(item.id)
-
-                    # Restore stock
-                    self.products.update_stock(item.product_id, item.quantity)
-
-                    refund_amount += item.line_total
+            # Lookup, checks and writes share one transaction so two returns
+            # of the same item cannot both pass the 'already returned' check
+            with self.db.transaction():
+                invoice = self.invoices.get_by_number(invoice_number)
+                if not invoice:
+                    return self._response(False, error="Invoice not found")
+
+                item_ids_set = set(item_ids)
+                refund_amount = 0
+                returned_ids = []
+                stock_deltas = defaultdict(int)
+
+                for item in invoice.items:
+                    if item.id in item_ids_set:
+                        if item.return_status == 'returned':
+                            return self._response(False, error=f"Item {item.id} already returned")
+
+                        returned_ids.append(item.id)
+                        stock_deltas[item.product_id] += item.quantity
+                        refund_amount += item.line_total
+
+                # Update invoice status
+                all_returned = all(
+                    item.id in item_ids_set or item.return_status == 'returned'
+                    for item in invoice.items
+                )
 
-            # Update invoice status
-            all_returned = all(
-                item.id in item_ids or item.return_status == 'returned'
-                for item in invoice.items
-            )
+                new_status = 'returned' if all_returned else 'partial_return'
 
-            new_status = 'returned' if all_returned else 'partial_return'
-            self.invoices.update_status(invoice.id, new_status)
+                # Mark as returned and restore stock
+                self.invoices.mark_items_returned_bulk(returned_ids)
+                self.products.update_stock_bulk(stock_deltas)
+                self.invoices.update_status(invoice.id, new_status)
 
-            # Log return
-            self.audit.log_invoice_returned(invoice_number, item_ids, refund_amount)
+                # Log return
+                self.audit.log_invoice_returned(invoice_number, item_ids, refund_amount)
 
             return self._response(True, {
                 'invoice_number': invoice_number,
@@ -395,18 +564,8 @@ class API:
     def hash_chain_verify(self) -> dict:
         """Verify entire hash chain integrity."""
         try:
-            # Get all invoices in order
-            rows = self.db.fetchall(
-                "SELECT * FROM invoices ORDER BY id ASC"
-            )
-
-            invoices = []
-            for row in rows:
-                items = self.invoices._get_items(row['id'])
-                invoice = Invoice.from_row(row, items)
-                invoices.append(invoice.to_dict())
-
-            result = HashChain.verify_chain(invoices)
+            # Stream invoices in order; only one is held in memory at a time
+            result = HashChain.verify_chain(self.invoices.iter_for_verification())
 
             return self._response(
                 result.valid,
@@ -429,18 +588,12 @@ class API:
             if not invoice:
                 return self._response(False, error="Invoice not found")
 
-            # Generate QR image
-            _, qr_image = self.qr_generator.generate_for_invoice(
-                invoice_number=invoice.invoice_number,
-                total=invoice.total,
-                hash_value=invoice.current_hash,
-                timestamp=invoice.created_at
-            )
+            qr_image = self._ensure_qr_image(invoice)
 
             self.printer.print_receipt(
                 store_name=invoice.store_name,
                 invoice_number=invoice.invoice_number,
-                items=[item.to_dict() for item in invoice.items],
+                items=invoice.items_dicts,
                 subtotal=invoice.subtotal,
                 vat_amount=invoice.vat_amount,
                 total=invoice.total,
@@ -460,28 +613,27 @@ class API:
             return self._response(False, error=str(e))
 
     def generate_pdf(self, invoice_id: int) -> dict:
+        """Start generating a PDF receipt in the background."""
+        return self._submit_job(self._generate_pdf_sync, invoice_id)
+
+    def generate_pdf_status(self, job_id: str) -> dict:
+        """Get the state of a generate_pdf job."""
+        return self._job_status(job_id)
+
+    def _generate_pdf_sync(self, invoice_id: int) -> dict:
         """Generate PDF receipt."""
         try:
             invoice = self.invoices.get_by_id(invoice_id)
             if not invoice:
                 return self._response(False, error="Invoice not found")
 
-            # Generate QR image
-            _, qr_image = self.qr_generator.generate_for_invoice(
-                invoice_number=invoice.invoice_number,
-                total=invoice.total,
-                hash_value=invoice.current_hash,
-                timestamp=invoice.created_at
-            )
-
-            invoice_data = invoice.to_dict()
-            invoice_data['qr_image'] = qr_image
+            qr_image = self._ensure_qr_image(invoice)
 
-            pdf_path = self.pdf_generator.save_receipt_pdf(
+            return self._save_pdf(
                 invoice_number=invoice.invoice_number,
                 store_name=invoice.store_name,
                 seller_id=invoice.seller_id,
-                items=[item.to_dict() for item in invoice.items],
+                items=invoice.items_dicts,
                 subtotal=invoice.subtotal,
                 vat_amount=invoice.vat_amount,
                 total=invoice.total,
@@ -492,38 +644,66 @@ class API:
                 customer_email=invoice.customer_email
             )
 
-            return self._response(True, {'path': str(pdf_path)})
+        except Exception as e:
+            return self._response(False, error=str(e))
 
+    def _save_pdf(self, **receipt) -> dict:
+        """Render and save a receipt PDF, returning its path."""
+        try:
+            pdf_path = self.pdf_generator.save_receipt_pdf(**receipt)
+            return self._response(True, {'path': str(pdf_path)})
         except Exception as e:
             return self._response(False, error=str(e))
 
     def send_email(self, invoice_id: int, email: str) -> dict:
+        """Queue a receipt email and start sending it in the background."""
+        try:
+            queue_id = self.email_queue.add(invoice_id, email)
+            return self._submit_job(self._deliver_queued_email, queue_id, invoice_id, email)
+        except Exception as e:
+            return self._response(False, error=str(e))
+
+    def _deliver_queued_email(self, queue_id: int, invoice_id: int, email: str) -> dict:
+        """Send a queued receipt email and record the outcome in the queue."""
+        result = self._send_email_sync(invoice_id, email)
+        if result['success']:
+            self.email_queue.mark_sent(queue_id)
+        else:
+            self.email_queue.mark_failed(queue_id, result.get('error'))
+        return result
+
+    def _resume_email_queue(self) -> None:
+        """Restart delivery of emails left pending when the app last closed."""
+        try:
+            for queued in self.email_queue.get_pending():
+                self._pool.submit(
+                    self._deliver_queued_email, queued.id, queued.invoice_id, queued.email
+                )
+        except Exception:
+            pass  # Don't block startup on the email queue
+
+    def send_email_status(self, job_id: str) -> dict:
+        """Get the state of a send_email job."""
+        return self._job_status(job_id)
+
+    def _send_email_sync(self, invoice_id: int, email: str) -> dict:
         """Send receipt via email."""
         try:
             invoice = self.invoices.get_by_id(invoice_id)
             if not invoice:
                 return self._response(False, error="Invoice not found")
 
-            # Configure email service
-            smtp_config = self.settings.get_smtp_config()
-            self.email_service.set_config(EmailConfig.from_dict(smtp_config))
-
-            if not self.email_service.is_configured():
+            email_service = self._get_email_service()
+            if not email_service.is_configured():
                 return self._response(False, error="Email not configured")
 
-            # Generate PDF
-            _, qr_image = self.qr_generator.generate_for_invoice(
-                invoice_number=invoice.invoice_number,
-                total=invoice.total,
-                hash_value=invoice.current_hash,
-                timestamp=invoice.created_at
-            )
+            qr_image = self._ensure_qr_image(invoice)
 
             pdf_bytes = self.pdf_generator.generate_receipt_pdf(
                 store_name=invoice.store_name,
                 invoice_number=invoice.invoice_number,
                 seller_id=invoice.seller_id,
-                items=[item.to_dict() for item in invoice.items],
+                items=invoice.items_dicts,
                 subtotal=invoice.subtotal,
                 vat_amount=invoice.vat_amount,
                 total=invoice.total,
@@ -534,7 +714,7 @@ class API:
             )
 
             # Send email
-            result = self.email_service.send_receipt(
+            result = email_service.send_receipt(
                 to_email=email,
                 invoice_number=invoice.invoice_number,
                 store_name=invoice.store_name,
@@ -564,9 +744,13 @@ class API:
     def settings_update(self, key: str, value: Any) -> dict:
         """Update a single setting."""
         try:
-            old_value = self.settings.get(key)
-            self.settings.set(key, value)
-            self.audit.log_setting_changed(key, old_value, str(value))
+            # The change and its audit entry commit together
+            with self.db.transaction():
+                old_value = self.settings.get(key)
+                self.settings.set(key, value)
+                self.audit.log_setting_changed(key, old_value, str(value))
+            if key.startswith('smtp_'):
+                self._smtp_cfg = None
             return self._response(True)
         except Exception as e:
             return self._response(False, error=str(e))
@@ -574,7 +758,21 @@ class API:
     def settings_update_many(self, settings: dict) -> dict:
         """Update multiple settings."""
         try:
-            self.settings.set_many(settings)
+            # The changes and their audit entry commit together
+            with self.db.transaction():
+                old_values = self.settings.get_many(settings.keys())
+                self.settings.set_many(settings)
+
+                new_values = self.settings.get_many(settings.keys())
+                changes = {
+                    key: (old_values[key], new_values[key])
+                    for key in settings
+                    if old_values[key] != new_values[key]
+                }
+                if changes:
+                    self.audit.log_settings_changed(changes)
+            if any(key.startswith('smtp_') for key in settings):
+                self._smtp_cfg = None
             return self._response(True)
         except Exception as e:
             return self._response(False, error=str(e))
@@ -815,23 +1013,7 @@ class API:
     def printer_list_ports(self) -> dict:
         """List available USB printer ports on Windows."""
         try:
-            ports = []
-            # Check for USB001-USB009
-            for i in range(1, 10):
-                port = f"USB{i:03d}"
-                try:
-                    result = subprocess.run(
-                        ['powershell', '-NoProfile', '-Command',
-                         f"Get-PrinterPort -Name '{port}' -ErrorAction SilentlyContinue | Select-Object -ExpandProperty Name"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode == 0 and port in result.stdout:
-                        ports.append(port)
-                except:
-                    pass
-            return self._response(True, ports)
+            return self._response(True, list_usb_printer_ports())
         except Exception as e:
             return self._response(False, error=str(e))
 
@@ -862,10 +1044,12 @@ class API:
             return self._response(False, error=str(e))
 
     def reports_export_csv(self, report_type: str, params: dict = None) -> dict:
-        """Export report to CSV."""
+        """Export report to a CSV file in the reports folder."""
         try:
-            csv_content = self.reports.export_csv(report_type, params)
-            return self._response(True, {'csv': csv_content})
+            _, compact, _ = _now_timestamps()
+            output_path = self.reports_output_dir / f"report_{report_type}_{compact}.csv"
+            path = self.reports.export_csv(report_type, params, output_path=str(output_path))
+            return self._response(True, {'path': path})
         except Exception as e:
             return self._response(False, error=str(e))
 
@@ -882,9 +1066,7 @@ class API:
     def email_test_connection(self) -> dict:
         """Test SMTP connection."""
         try:
-            smtp_config = self.settings.get_smtp_config()
-            self.email_service.set_config(EmailConfig.from_dict(smtp_config))
-            result = self.email_service.test_connection()
+            result = self._get_email_service().test_connection()
             return self._response(result.success, error=result.error)
         except Exception as e:
             return self._response(False, error=str(e))
@@ -927,7 +1109,7 @@ class API:
                 return self._response(False, error=f"Invoice {invoice_number} not found")
 
             # Get items
-            items = [item.to_dict() for item in invoice.items]
+            items = invoice.items_dicts
 
             # Normalize items like HashChain does
             normalized_items = [
@@ -954,13 +1136,8 @@ class API:
             hash_input = json.dumps(hash_data, sort_keys=True, separators=(',', ':'))
 
             # Recalculate hash
-            recalculated_hash = HashChain.calculate_hash(
-                invoice_number=invoice.invoice_number,
-                seller_id=invoice.seller_id,
-                total=invoice.total,
-                items=items,
-                timestamp=invoice.created_at,
-                previous_hash=invoice.previous_hash or HashChain.GENESIS_HASH
+            recalculated_hash = HashChain.calculate_hash_for_invoice_obj(
+                invoice, invoice.previous_hash or HashChain.GENESIS_HASH
             )
 
             # Build response
@@ -2,10 +2,68 @@
 
 import hashlib
 import json
-from typing import Optional
+import math
+from json.encoder import encode_basestring_ascii
+from typing import Iterable, Optional
 from dataclasses import dataclass
 
 
+# hashlib's SHA-256 is OpenSSL's, which already picks SHA-NI / ARMv8 crypto
+# instructions at runtime; bound once so the per-invoice call skips the
+# module attribute lookup.
+_sha256 = hashlib.sha256
+
+# Canonical encoder for hash input. json.dumps() builds a new encoder on
+# every call when given non-default options; reusing one skips that while
+# producing the exact same bytes, which stored hashes depend on.
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+# The hash input has a fixed shape, so it is written out directly with the
+# keys already in sort_keys order. Values go through _json_scalar(), which
+# spells them exactly like _CANONICAL_ENCODER.
+_PAYLOAD_TEMPLATE = (
+    '{"invoice_number":%s,"items":[%s],"previous_hash":%s,'
+    '"seller_id":%s,"timestamp":%s,"total":%s}'
+)
+_ITEM_TEMPLATE = '{"line_total":%s,"product_id":%s,"quantity":%s,"unit_price":%s}'
+
+# The item fields that go into the hash
+_HASHED_ITEM_FIELDS = ('product_id', 'quantity', 'unit_price', 'line_total')
+
+
+def _normalize_items(items, read=dict.get) -> list[dict]:
+    """
+    Project items onto the hashed fields.
+
+    read fetches one field: dict.get for item dicts, getattr for
+    InvoiceItem objects.
+    """
+    return [{name: read(item, name) for name in _HASHED_ITEM_FIELDS} for item in items]
+
+
+def _json_scalar(value) -> str:
+    """
+    Encode a str, int, float, bool or None like _CANONICAL_ENCODER does.
+
+    Raises TypeError for anything else (and for NaN/infinity), so the
+    caller can fall back to the generic encoder.
+    """
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring_ascii(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value_type is int:
+        return int.__repr__(value)
+    if value_type is float and math.isfinite(value):
+        return float.__repr__(value)
+    raise TypeError(f"Unsupported hash value: {value!r}")
+
+
 @dataclass
 class HashVerificationResult:
     """Result of hash chain verification."""
@@ -35,47 +93,98 @@ class HashChain:
         The hash includes all critical invoice data plus the previous hash,
         creating an unbreakable chain where any modification is detectable.
         """
-        # Normalize items to ensure consistent hashing
-        normalized_items = [
-            {
-                'product_id': item.get('product_id'),
-                'quantity': item.get('quantity'),
-                'unit_price': item.get('unit_price'),
-                'line_total': item.get('line_total'),
-            }
-            for item in items
-        ]
+        return _sha256(
+            HashChain.canonical_bytes(
+                invoice_number, seller_id, total, items, timestamp, previous_hash
+            )
+        ).hexdigest()
+
+    @staticmethod
+    def canonical_bytes(
+        invoice_number: str,
+        seller_id: str,
+        total: float,
+        items: list[dict],
+        timestamp: str,
+        previous_hash: str
+    ) -> bytes:
+        """Build the exact byte string that calculate_hash() digests."""
+        return HashChain._payload_bytes(
+            invoice_number, seller_id, total, _normalize_items(items),
+            timestamp, previous_hash
+        )
+
+    @staticmethod
+    def _payload_bytes(
+        invoice_number: str,
+        seller_id: str,
+        total: float,
+        normalized_items: list[dict],
+        timestamp: str,
+        previous_hash: str
+    ) -> bytes:
+        """Encode the hash input from items that already hold only the hashed fields."""
+        total = round(total, 2)
+        try:
+            items_json = ','.join(
+                _ITEM_TEMPLATE % (
+                    _json_scalar(item['line_total']),
+                    _json_scalar(item['product_id']),
+                    _json_scalar(item['quantity']),
+                    _json_scalar(item['unit_price']),
+                )
+                for item in normalized_items
+            )
+            return (_PAYLOAD_TEMPLATE % (
+                _json_scalar(invoice_number),
+                items_json,
+                _json_scalar(previous_hash),
+                _json_scalar(seller_id),
+                _json_scalar(timestamp),
+                _json_scalar(total),
+            )).encode()
+        except TypeError:
+            pass
 
+        # Unusual values (e.g. NaN or non-JSON types): let the generic
+        # encoder produce or reject them exactly as before
         data = {
             'invoice_number': invoice_number,
             'seller_id': seller_id,
-            'total': round(total, 2),
+            'total': total,
             'items': normalized_items,
             'timestamp': timestamp,
             'previous_hash': previous_hash
         }
-
-        # Sort keys for deterministic output
-        data_string = json.dumps(data, sort_keys=True, separators=(',', ':'))
-
-        return hashlib.sha256(data_string.encode('utf-8')).hexdigest()
+        return _CANONICAL_ENCODER.encode(data).encode('utf-8')
 
     @staticmethod
     def calculate_hash_from_invoice(invoice: dict, previous_hash: str) -> str:
-        """Calculate hash from an invoice dictionary."""
-        items = invoice.get('items', [])
-        if hasattr(items[0] if items else None, 'to_dict'):
-            items = [item.to_dict() for item in items]
+        """
+        Calculate hash from an invoice dictionary whose items are dicts.
 
+        Invoice objects go through calculate_hash_for_invoice_obj().
+        """
         return HashChain.calculate_hash(
             invoice_number=invoice['invoice_number'],
             seller_id=invoice['seller_id'],
             total=invoice['total'],
-            items=items,
+            items=invoice.get('items', []),
             timestamp=invoice['created_at'],
             previous_hash=previous_hash
         )
 
+    @staticmethod
+    def calculate_hash_for_invoice_obj(invoice, previous_hash: str) -> str:
+        """Calculate hash from an Invoice object loaded by InvoiceRepository."""
+        # Read the hashed fields straight off the items rather than
+        # converting each whole item to a dict first
+        return _sha256(HashChain._payload_bytes(
+            invoice.invoice_number, invoice.seller_id, invoice.total,
+            _normalize_items(invoice.items, getattr), invoice.created_at,
+            previous_hash
+        )).hexdigest()
+
     @staticmethod
     def verify_single(
         invoice: dict,
@@ -87,53 +196,62 @@ class HashChain:
         return calculated == expected_hash
 
     @classmethod
-    def verify_chain(cls, invoices: list[dict]) -> HashVerificationResult:
+    def verify_chain(cls, invoices: Iterable) -> HashVerificationResult:
         """
         Verify the entire hash chain.
 
+        Invoices are consumed one at a time, so a generator can stream
+        an arbitrarily long chain with constant memory.
+
         Args:
-            invoices: List of invoices in chronological order (oldest first)
+            invoices: Invoice dicts in chronological order (oldest first), with
+                id, invoice_number, seller_id, total, created_at, previous_hash,
+                current_hash and items holding exactly product_id, quantity,
+                unit_price and line_total, as yielded by
+                InvoiceRepository.iter_for_verification
 
         Returns:
             HashVerificationResult with validation status
         """
-        if not invoices:
-            return HashVerificationResult(valid=True, checked_count=0)
-
         previous_hash = cls.GENESIS_HASH
+        checked_count = 0
 
-        for i, invoice in enumerate(invoices):
-            expected_hash = invoice.get('current_hash')
+        for invoice in invoices:
+            expected_hash = invoice['current_hash']
 
-            # Calculate what the hash should be
-            calculated_hash = cls.calculate_hash_from_invoice(invoice, previous_hash)
+            # Items come from iter_for_verification already holding only the
+            # hashed fields, so they are encoded without re-normalizing
+            calculated_hash = _sha256(cls._payload_bytes(
+                invoice['invoice_number'], invoice['seller_id'], invoice['total'],
+                invoice['items'], invoice['created_at'], previous_hash
+            )).hexdigest()
 
             if calculated_hash != expected_hash:
                 return HashVerificationResult(
                     valid=False,
-                    error_message=f"Hash mismatch at invoice {invoice.get('invoice_number')}",
-                    failed_invoice_id=invoice.get('id'),
-                    checked_count=i
+                    error_message=f"Hash mismatch at invoice {invoice['invoice_number']}",
+                    failed_invoice_id=invoice['id'],
+                    checked_count=checked_count
                 )
 
             # Verify the chain link
-            stored_previous = invoice.get('previous_hash')
-            if stored_previous != previous_hash:
+            if invoice['previous_hash'] != previous_hash:
                 return HashVerificationResult(
                     valid=False,
-                    error_message=f"Chain break at invoice {invoice.get('invoice_number')}",
-                    failed_invoice_id=invoice.get('id'),
-                    checked_count=i
+                    error_message=f"Chain break at invoice {invoice['invoice_number']}",
+                    failed_invoice_id=invoice['id'],
+                    checked_count=checked_count
                 )
 
             previous_hash = expected_hash
+            checked_count += 1
 
         return HashVerificationResult(
             valid=True,
-            checked_count=len(invoices)
+            checked_count=checked_count
         )
 
     @staticmethod
     def get_hash_prefix(full_hash: str, length: int = 8) -> str:
-        """Get the first N characters of a hash for display/QR codes."""
-        return full_hash[:length] if full_hash else ""
+        """Get the first N characters of a hash for display/QR codes (full_hash must not be None)."""
+        return full_hash[:length]
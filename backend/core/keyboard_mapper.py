@@ -1,5 +1,6 @@
 """Keyboard layout mapper for barcode scanner support."""
 
+from functools import lru_cache
 from typing import Optional
 
 
@@ -72,7 +73,10 @@ class KeyboardMapper:
     }
 
     # Reverse mappings (other layout → original)
-    REVERSE_LAYOUTS = {}
+    REVERSE_LAYOUTS = {
+        layout_name: {v: k for k, v in mapping.items()}
+        for layout_name, mapping in LAYOUTS.items()
+    }
 
     def __init__(self, scanner_layout: str = 'qwerty_us', system_layout: str = 'qwerty_us'):
         """
@@ -84,12 +88,6 @@ class KeyboardMapper:
         """
         self.scanner_layout = scanner_layout.lower()
         self.system_layout = system_layout.lower()
-        self._build_reverse_mappings()
-
-    def _build_reverse_mappings(self):
-        """Build reverse mappings for all layouts."""
-        for layout_name, mapping in self.LAYOUTS.items():
-            self.REVERSE_LAYOUTS[layout_name] = {v: k for k, v in mapping.items()}
 
     def convert_input(self, text: str) -> str:
         """
@@ -107,15 +105,15 @@ class KeyboardMapper:
         if self.system_layout == self.scanner_layout:
             return text
 
-        # Get the mapping for converting system layout back to scanner layout
+        # Get the table for converting system layout back to scanner layout
         if self.system_layout == 'qwerty_es' and self.scanner_layout == 'qwerty_us':
-            mapping = self.ES_TO_US
-        elif self.system_layout in self.LAYOUTS:
-            mapping = self.REVERSE_LAYOUTS.get(self.system_layout, {})
+            table = _TO_QWERTY_TABLES['qwerty_es']
         else:
-            return text
+            table = _REVERSE_TABLES.get(self.system_layout)
+            if table is None:
+                return text
 
-        return ''.join(mapping.get(c, c) for c in text)
+        return table(text)
 
     def map_to_qwerty(self, text: str, source_layout: Optional[str] = None) -> str:
         """
@@ -133,12 +131,8 @@ class KeyboardMapper:
         if layout == 'qwerty_us':
             return text
 
-        if layout == 'qwerty_es':
-            mapping = self.ES_TO_US
-        else:
-            mapping = self.REVERSE_LAYOUTS.get(layout, {})
-
-        return ''.join(mapping.get(c, c) for c in text)
+        table = _TO_QWERTY_TABLES.get(layout)
+        return table(text) if table else text
 
     def map_from_qwerty(self, text: str, target_layout: Optional[str] = None) -> str:
         """
@@ -156,12 +150,8 @@ class KeyboardMapper:
         if layout == 'qwerty_us':
             return text
 
-        if layout == 'qwerty_es':
-            mapping = self.US_TO_ES
-        else:
-            mapping = self.LAYOUTS.get(layout, {})
-
-        return ''.join(mapping.get(c, c) for c in text)
+        table = _FROM_QWERTY_TABLES.get(layout)
+        return table(text) if table else text
 
     @classmethod
     def get_available_layouts(cls) -> list[dict]:
@@ -190,10 +180,10 @@ class KeyboardMapper:
         Returns:
             Corrected barcode text
         """
-        mapping = KeyboardMapper.ES_TO_US
-        return ''.join(mapping.get(c, c) for c in text)
+        return _TO_QWERTY_TABLES['qwerty_es'](text)
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def detect_layout_issue(text: str) -> Optional[str]:
         """
         Try to detect if text has keyboard layout issues.
@@ -204,23 +194,13 @@ class KeyboardMapper:
         Returns:
             Suggested source layout if issue detected, None otherwise
         """
-        # Spanish keyboard indicators - characters that appear when scanner
-        # sends US scancodes but Windows uses Spanish layout
-        spanish_indicators = {
-            'Ñ': ':',   # Colon
-            'ñ': ';',   # Semicolon
-            'Ç': '|',   # Pipe
-            'ç': '\\',  # Backslash
-            '¿': '+',   # Plus
-            '¡': '=',   # Equals
-        }
-
-        # Count Spanish keyboard artifacts
-        spanish_count = sum(1 for c in text if c in spanish_indicators)
+        # Every indicator below is non-ASCII
+        if text.isascii():
+            return None
 
         # If we find any Spanish keyboard characters in what looks like
         # a barcode, URL, or structured data (has alphanumeric content)
-        if spanish_count > 0:
+        if not _SPANISH_INDICATORS.isdisjoint(text):
             # Check if text has typical barcode/URL patterns when fixed
             has_alphanum = any(c.isalnum() for c in text)
             if has_alphanum:
@@ -238,9 +218,7 @@ class KeyboardMapper:
             return 'qwerty_es'
 
         # Check for AZERTY indicators
-        azerty_indicators = set('éèàù')
-        azerty_count = sum(1 for c in text if c in azerty_indicators)
-        if azerty_count > 0 and not text[0:1].isdigit():
+        if not _AZERTY_INDICATORS.isdisjoint(text) and not text[0:1].isdigit():
             return 'azerty'
 
         return None
@@ -261,8 +239,7 @@ class KeyboardMapper:
         if detected == 'qwerty_es':
             return KeyboardMapper.fix_spanish_barcode(text)
         elif detected == 'azerty':
-            mapper = KeyboardMapper(system_layout='azerty')
-            return mapper.map_to_qwerty(text)
+            return _TO_QWERTY_TABLES['azerty'](text)
 
         return text
 
@@ -286,21 +263,24 @@ class KeyboardMapper:
         if not text:
             return text
 
+        # Plain numeric barcodes (EAN/UPC) read the same in every layout
+        if text.isascii() and text.isdigit():
+            return text
+
         layout = layout.lower() if layout else 'auto'
 
         if layout == 'auto':
+            # Every indicator auto-detection looks for is non-ASCII
+            if text.isascii():
+                return text
             return KeyboardMapper.auto_fix(text)
         elif layout == 'qwerty_us':
             # No conversion needed
             return text
         elif layout == 'qwerty_es':
             return KeyboardMapper.fix_spanish_barcode(text)
-        elif layout == 'azerty':
-            mapper = KeyboardMapper(system_layout='azerty')
-            return mapper.map_to_qwerty(text)
-        elif layout == 'qwertz':
-            mapper = KeyboardMapper(system_layout='qwertz')
-            return mapper.map_to_qwerty(text)
+        elif layout in ('azerty', 'qwertz'):
+            return _TO_QWERTY_TABLES[layout](text)
         else:
             # Unknown layout, try auto-fix
             return KeyboardMapper.auto_fix(text)
@@ -351,6 +331,14 @@ class KeyboardMapper:
         if len(barcode) != 13 or not barcode.isdigit():
             return False
 
+        if barcode.isascii():
+            # Sum the byte values of the odd and even positions with slices
+            # and remove the '0' offset (48) of all 12 digits afterwards:
+            # weights 1 and 3 over 6 digits each give 48 * (6 + 18)
+            digits = barcode.encode('ascii')
+            total = sum(digits[0:12:2]) + 3 * sum(digits[1:12:2]) - 48 * 24
+            return (10 - total % 10) % 10 == digits[12] - 48
+
         # Calculate checksum
         total = 0
         for i, digit in enumerate(barcode[:12]):
@@ -359,3 +347,62 @@ class KeyboardMapper:
 
         check_digit = (10 - (total % 10)) % 10
         return int(barcode[12]) == check_digit
+
+
+# Spanish keyboard indicators - characters that appear when the scanner
+# sends US scancodes but Windows uses the Spanish layout
+# (Ñ :, ñ ;, Ç |, ç \, ¿ +, ¡ =)
+_SPANISH_INDICATORS = frozenset('ÑñÇç¿¡')
+_AZERTY_INDICATORS = frozenset('éèàù')
+
+
+class _Translator:
+    """
+    A str.translate table plus an equivalent 256-byte table.
+
+    Text that fits in Latin-1 (every scan without a typographic quote) is
+    mapped with bytes.translate, a flat array lookup per character,
+    instead of str.translate's dict lookup per non-ASCII character.
+    Anything else falls back to the str table.
+    """
+
+    __slots__ = ('table', 'dense')
+
+    def __init__(self, mapping: dict):
+        self.table = str.maketrans(mapping)
+        dense = bytearray(range(256))
+        for source, target in mapping.items():
+            if ord(source) >= 256:
+                continue  # never present in Latin-1 text
+            if len(target) != 1 or ord(target) >= 256:
+                dense = None
+                break
+            dense[ord(source)] = ord(target)
+        self.dense = bytes(dense) if dense is not None else None
+
+    def __call__(self, text: str) -> str:
+        if self.dense is not None:
+            try:
+                return text.encode('latin-1').translate(self.dense).decode('latin-1')
+            except UnicodeEncodeError:
+                pass
+        return text.translate(self.table)
+
+
+# Translators, built once at import: layout -> QWERTY US and back
+_TO_QWERTY_TABLES = {
+    layout_name: _Translator(
+        KeyboardMapper.ES_TO_US if layout_name == 'qwerty_es' else reverse
+    )
+    for layout_name, reverse in KeyboardMapper.REVERSE_LAYOUTS.items()
+}
+_REVERSE_TABLES = {
+    layout_name: _Translator(reverse)
+    for layout_name, reverse in KeyboardMapper.REVERSE_LAYOUTS.items()
+}
+_FROM_QWERTY_TABLES = {
+    layout_name: _Translator(
+        KeyboardMapper.US_TO_ES if layout_name == 'qwerty_es' else mapping
+    )
+    for layout_name, mapping in KeyboardMapper.LAYOUTS.items()
+}
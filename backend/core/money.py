@@ -0,0 +1,40 @@
+"""Integer-cent arithmetic for invoice amounts."""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+# Hundredths of an amount (cents) or of a percentage (basis points)
+HUNDRED = Decimal(100)
+WHOLE = Decimal(1)
+
+
+def _hundredths(value: float) -> int:
+    """Scale a decimal value by 100 and round half up, without float drift."""
+    # str() gives the shortest repr, so 1.005 is treated as exactly 1.005
+    scaled = Decimal(str(value)) * HUNDRED
+    return int(scaled.quantize(WHOLE, rounding=ROUND_HALF_UP))
+
+
+def to_cents(amount: float) -> int:
+    """Convert a currency amount to whole cents."""
+    return _hundredths(amount)
+
+
+def from_cents(cents: int) -> float:
+    """Convert whole cents back to a currency amount."""
+    return cents / 100
+
+
+def rate_to_basis_points(rate: float) -> int:
+    """Convert a percentage rate (e.g. 21.0) to basis points (2100)."""
+    return _hundredths(rate)
+
+
+def vat_cents(weighted_cents: int) -> int:
+    """
+    Round an accumulated VAT amount to whole cents, half up.
+
+    Args:
+        weighted_cents: Sum of line_total_cents * vat_rate_basis_points,
+            i.e. the exact VAT in units of 1/10000 cent
+    """
+    return (weighted_cents + 5000) // 10000
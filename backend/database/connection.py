@@ -2,9 +2,10 @@
 
 import sqlite3
 import os
+import threading
 from pathlib import Path
 from contextlib import contextmanager
-from typing import Optional
+from typing import Iterator, Optional
 
 # Default database path
 DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / "data" / "openinvoice.db"
@@ -14,13 +15,15 @@ class Database:
     """SQLite database connection manager."""
 
     _instance: Optional['Database'] = None
-    _connection: Optional[sqlite3.Connection] = None
 
     def __new__(cls, db_path: Optional[Path] = None):
         """Singleton pattern for database connection."""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._db_path = db_path or DEFAULT_DB_PATH
+            cls._instance._local = threading.local()
+            cls._instance._owners = {}  # connection -> owning thread
+            cls._instance._pool_lock = threading.Lock()
             cls._instance._ensure_directory()
         return cls._instance
 
@@ -30,16 +33,104 @@ class Database:
 
     @property
     def connection(self) -> sqlite3.Connection:
-        """Get or create database connection."""
-        if self._connection is None:
-            self._connection = sqlite3.connect(
-                str(self._db_path),
-                check_same_thread=False
-            )
-            self._connection.row_factory = sqlite3.Row
-            # Enable foreign keys
-            self._connection.execute("PRAGMA foreign_keys = ON")
-        return self._connection
+        """Get the calling thread's connection, creating it on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or connection not in self._owners:
+            connection = self._acquire_connection()
+            self._local.connection = connection
+            self._local.transaction_depth = 0
+        return connection
+
+    def _acquire_connection(self) -> sqlite3.Connection:
+        """
+        Hand the current thread a connection of its own.
+
+        pywebview runs each API call on a fresh thread, so connections left
+        behind by finished threads are reused before a new one is opened.
+        """
+        current = threading.current_thread()
+        with self._pool_lock:
+            for connection, owner in self._owners.items():
+                if not owner.is_alive():
+                    if connection.in_transaction:
+                        connection.rollback()
+                    self._owners[connection] = current
+                    return connection
+            connection = self.open_connection()
+            self._owners[connection] = current
+            return connection
+
+    def open_connection(self) -> sqlite3.Connection:
+        """Open a new connection to the database with standard PRAGMAs applied."""
+        connection = sqlite3.connect(
+            str(self._db_path),
+            check_same_thread=False,
+            # Prepared statements kept per connection (default 128); the
+            # repositories use about a hundred fixed queries, plus IN (...)
+            # lists whose text varies with their length
+            cached_statements=256
+        )
+        connection.row_factory = sqlite3.Row
+        # Enable foreign keys
+        connection.execute("PRAGMA foreign_keys = ON")
+        # WAL lets readers run alongside a writer; NORMAL syncs only at checkpoints
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.execute("PRAGMA mmap_size = 268435456")
+        # ~20 MB page cache per connection (negative values are KiB)
+        connection.execute("PRAGMA cache_size = -20000")
+        return connection
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether this thread has an explicit transaction() block open."""
+        return getattr(self._local, 'transaction_depth', 0) > 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block of writes inside a single BEGIN IMMEDIATE ... COMMIT.
+
+        Repository writes issued inside the block skip their own commit, so
+        the whole block costs one fsync and is rolled back as a unit on error.
+        Nested blocks join the outermost transaction.
+        """
+        if self.in_transaction:
+            self._local.transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._local.transaction_depth -= 1
+            return
+
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        self._local.transaction_depth = 1
+        self._local.after_transaction = []
+        try:
+            yield self
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self._local.transaction_depth = 0
+            callbacks, self._local.after_transaction = self._local.after_transaction, []
+            for callback in callbacks:
+                callback()
+
+    def after_transaction(self, callback) -> None:
+        """
+        Run callback once this thread's transaction() block has ended.
+
+        Called right away when no transaction is open. Used by caches that
+        must drop entries only after a write is committed or rolled back.
+        """
+        if self.in_transaction:
+            self._local.after_transaction.append(callback)
+        else:
+            callback()
 
     @contextmanager
     def cursor(self):
@@ -47,9 +138,11 @@ class Database:
         cursor = self.connection.cursor()
         try:
             yield cursor
-            self.connection.commit()
+            if not self.in_transaction:
+                self.connection.commit()
         except Exception:
-            self.connection.rollback()
+            if not self.in_transaction:
+                self.connection.rollback()
             raise
         finally:
             cursor.close()
@@ -68,30 +161,31 @@ class Database:
 
     def fetchone(self, query: str, params: tuple = ()) -> Optional[sqlite3.Row]:
         """Execute query and fetch one result."""
-        cursor = self.connection.cursor()
-        cursor.execute(query, params)
-        result = cursor.fetchone()
-        cursor.close()
-        return result
+        return self.connection.execute(query, params).fetchone()
 
     def fetchall(self, query: str, params: tuple = ()) -> list[sqlite3.Row]:
         """Execute query and fetch all results."""
+        return self.connection.execute(query, params).fetchall()
+
+    def iterate(self, query: str, params: tuple = ()) -> Iterator[sqlite3.Row]:
+        """Execute query and yield rows one at a time instead of fetching all."""
         cursor = self.connection.cursor()
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+        try:
+            cursor.execute(query, params)
+            yield from cursor
+        finally:
+            cursor.close()
 
     def close(self):
-        """Close database connection."""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        """Close every connection opened by this manager."""
+        with self._pool_lock:
+            for connection in self._owners:
+                connection.close()
+            self._owners.clear()
 
     @classmethod
     def reset(cls):
         """Reset singleton instance (for testing)."""
-        if cls._instance and cls._instance._connection:
-            cls._instance._connection.close()
+        if cls._instance:
+            cls._instance.close()
         cls._instance = None
-        cls._connection = None
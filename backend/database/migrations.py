@@ -3,7 +3,7 @@
 from .connection import Database
 
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 5
 
 MIGRATIONS = [
     # Version 1: Initial schema
@@ -84,6 +84,42 @@ MIGRATIONS = [
     CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice ON invoice_items(invoice_id);
     CREATE INDEX IF NOT EXISTS idx_audit_entity ON audit_log(entity_type, entity_id);
     """,
+
+    # Version 2: Store rendered QR image so reads don't re-encode it
+    """
+    ALTER TABLE invoices ADD COLUMN qr_image TEXT;
+    """,
+
+    # Version 3: Persistent queue for receipt emails, resumed on restart
+    """
+    CREATE TABLE IF NOT EXISTS email_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        invoice_id INTEGER NOT NULL,
+        email TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        error TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (invoice_id) REFERENCES invoices(id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_email_queue_status ON email_queue(status);
+    """,
+
+    # Version 4: Indexes for the remaining unindexed lookups
+    """
+    -- Foreign key checks when a product is deleted
+    CREATE INDEX IF NOT EXISTS idx_invoice_items_product ON invoice_items(product_id);
+    -- Audit log listings, newest first
+    CREATE INDEX IF NOT EXISTS idx_audit_created ON audit_log(created_at);
+    CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_log(action, created_at);
+    """,
+
+    # Version 5: Active product listings come from the index already sorted
+    """
+    CREATE INDEX IF NOT EXISTS idx_products_status_name ON products(status, name);
+    -- Covered by the prefix of idx_products_status_name
+    DROP INDEX IF EXISTS idx_products_status;
+    """,
 ]
 
 
@@ -102,20 +138,26 @@ def run_migrations(db: Database = None) -> int:
         db = Database()
 
     current_version = get_current_version(db)
+    connection = db.connection
 
     for version, migration in enumerate(MIGRATIONS, start=1):
         if version > current_version:
-            # Execute migration (may contain multiple statements)
-            for statement in migration.split(';'):
-                statement = statement.strip()
-                if statement:
-                    db.execute(statement)
-
-            # Record version
-            db.execute(
-                "INSERT OR REPLACE INTO schema_version (version) VALUES (?)",
-                (version,)
-            )
+            # Each migration and its version record run as one script in
+            # one transaction: SQLite parses the statements itself and a
+            # failed migration leaves nothing half-applied
+            try:
+                connection.executescript(
+                    f"""
+                    BEGIN IMMEDIATE;
+                    {migration};
+                    INSERT OR REPLACE INTO schema_version (version) VALUES ({int(version)});
+                    COMMIT;
+                    """
+                )
+            except Exception:
+                if connection.in_transaction:
+                    connection.rollback()
+                raise
 
     return len(MIGRATIONS)
 
@@ -130,6 +172,7 @@ def insert_default_settings(db: Database = None):
         'store_name': 'My Store',
         'seller_id': 'SELLER001',
         'printer_enabled': 'false',
+        'auto_save_pdf': 'true',
         'smtp_host': '',
         'smtp_port': '587',
         'smtp_username': '',
@@ -141,11 +184,20 @@ def insert_default_settings(db: Database = None):
         'default_vat_rate': '21.0',
     }
 
-    for key, value in defaults.items():
-        db.execute(
-            "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
-            (key, value)
-        )
+    # Runs on every start: skip the write when every default is present,
+    # but still add keys introduced by a newer version
+    placeholders = ','.join('?' * len(defaults))
+    row = db.fetchone(
+        f"SELECT COUNT(*) AS count FROM settings WHERE key IN ({placeholders})",
+        tuple(defaults)
+    )
+    if row and row['count'] == len(defaults):
+        return
+
+    db.executemany(
+        "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)",
+        list(defaults.items())
+    )
 
 
 def initialize_database(db: Database = None) -> None:
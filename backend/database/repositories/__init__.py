@@ -3,5 +3,9 @@ from .products import ProductRepository
 from .invoices import InvoiceRepository
 from .settings import SettingsRepository
 from .audit import AuditRepository
+from .email_queue import EmailQueueRepository
 
-__all__ = ['ProductRepository', 'InvoiceRepository', 'SettingsRepository', 'AuditRepository']
+__all__ = [
+    'ProductRepository', 'InvoiceRepository', 'SettingsRepository',
+    'AuditRepository', 'EmailQueueRepository',
+]
@@ -1,13 +1,26 @@
 """Audit log repository for tracking actions."""
 
 from typing import Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
 import json
+import logging
+import queue
+import threading
+import time
 
 from database.connection import Database
 
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time in the format of the created_at column's CURRENT_TIMESTAMP default."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+@dataclass(slots=True)
 class AuditEntry:
     """Audit log entry."""
     action: str
@@ -19,8 +32,15 @@ class AuditEntry:
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        data = asdict(self)
-        return data
+        # details is decoded fresh in from_row, so a shallow copy is enough
+        return {
+            'action': self.action,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'details': self.details,
+            'id': self.id,
+            'created_at': self.created_at
+        }
 
     @classmethod
     def from_row(cls, row) -> 'AuditEntry':
@@ -62,8 +82,22 @@ class AuditRepository:
     ENTITY_SETTING = 'setting'
     ENTITY_REPORT = 'report'
 
+    # Maximum entries written per background batch
+    BATCH_SIZE = 256
+
+    # Longest a read waits for queued entries to be written (seconds)
+    FLUSH_TIMEOUT = 2.0
+
+    _INSERT_SQL = """
+        INSERT INTO audit_log (action, entity_type, entity_id, details, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """
+
     def __init__(self, db: Database = None):
         self.db = db or Database()
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
 
     def log(
         self,
@@ -74,25 +108,128 @@ class AuditRepository:
     ) -> AuditEntry:
         """Create an audit log entry."""
         details_json = json.dumps(details) if details else None
+        # Set here so the entry can be returned without reading the row back
+        created_at = _utc_timestamp()
 
-        cursor = self.db.connection.cursor()
-        cursor.execute(
-            """
-            INSERT INTO audit_log (action, entity_type, entity_id, details)
-            VALUES (?, ?, ?, ?)
-            """,
-            (action, entity_type, entity_id, details_json)
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                self._INSERT_SQL,
+                (action, entity_type, entity_id, details_json, created_at)
+            )
+            entry_id = cursor.lastrowid
+
+        return AuditEntry(
+            id=entry_id,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            details=details or None,
+            created_at=created_at
         )
-        entry_id = cursor.lastrowid
-        self.db.connection.commit()
-        cursor.close()
 
-        return self.get_by_id(entry_id)
+    def add_batch(
+        self,
+        entries: list[tuple[str, str, Optional[str], Optional[dict], str]]
+    ) -> None:
+        """
+        Write several audit entries in one transaction.
+
+        Args:
+            entries: (action, entity_type, entity_id, details, created_at)
+                tuples, created_at being the UTC time the event happened
+        """
+        if not entries:
+            return
+
+        self.db.executemany(
+            self._INSERT_SQL,
+            [
+                (
+                    action, entity_type, entity_id,
+                    json.dumps(details) if details else None,
+                    created_at
+                )
+                for action, entity_type, entity_id, details, created_at in entries
+            ]
+        )
+
+    def enqueue(
+        self,
+        action: str,
+        entity_type: str,
+        entity_id: Optional[str] = None,
+        details: Optional[dict] = None
+    ) -> None:
+        """
+        Queue an audit log entry to be written in the background.
+
+        Entries are inserted in batches by a writer thread, so callers don't
+        pay a commit per entry. Only for low-value events (prints, emails,
+        imports): entries still queued when the process exits are lost, so
+        anything that must commit with the caller's writes uses log().
+        """
+        # Stamped now, not when the writer gets to it
+        self._queue.put((action, entity_type, entity_id, details, _utc_timestamp()))
+        self._ensure_writer()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued entry has been written.
+
+        Gives up after timeout seconds (FLUSH_TIMEOUT by default) or if the
+        writer thread has died. Returns whether the queue was drained.
+        """
+        writer = self._writer
+        if writer is None:
+            return True
+
+        deadline = time.monotonic() + (self.FLUSH_TIMEOUT if timeout is None else timeout)
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not writer.is_alive():
+                    return False
+                # Wake periodically to notice a dead writer
+                self._queue.all_tasks_done.wait(min(remaining, 0.1))
+        return True
+
+    def _ensure_writer(self) -> None:
+        """Start the background writer thread on first use."""
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_queued,
+                    name='audit-writer',
+                    daemon=True
+                )
+                self._writer.start()
+
+    def _write_queued(self) -> None:
+        """Writer thread: drain the queue in batches, one transaction each."""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.add_batch(batch)
+            except Exception:
+                # Keep the writer alive for later entries, but leave a trace
+                logger.exception("Failed to write %d audit entries", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
 
     def get_by_id(self, entry_id: int) -> Optional[AuditEntry]:
         """Get audit entry by ID."""
         row = self.db.fetchone(
-            "SELECT * FROM audit_log WHERE id = ?",
+            "SELECT id, action, entity_type, entity_id, details, created_at "
+            "FROM audit_log WHERE id = ?",
             (entry_id,)
         )
         return AuditEntry.from_row(row) if row else None
@@ -104,9 +241,11 @@ class AuditRepository:
         limit: int = 100
     ) -> list[AuditEntry]:
         """Get audit entries for a specific entity."""
+        self.flush()
         rows = self.db.fetchall(
             """
-            SELECT * FROM audit_log
+            SELECT id, action, entity_type, entity_id, details, created_at
+            FROM audit_log
             WHERE entity_type = ? AND entity_id = ?
             ORDER BY created_at DESC
             LIMIT ?
@@ -117,9 +256,11 @@ class AuditRepository:
 
     def get_by_action(self, action: str, limit: int = 100) -> list[AuditEntry]:
         """Get audit entries for a specific action."""
+        self.flush()
         rows = self.db.fetchall(
             """
-            SELECT * FROM audit_log
+            SELECT id, action, entity_type, entity_id, details, created_at
+            FROM audit_log
             WHERE action = ?
             ORDER BY created_at DESC
             LIMIT ?
@@ -130,9 +271,11 @@ class AuditRepository:
 
     def get_recent(self, limit: int = 100) -> list[AuditEntry]:
         """Get most recent audit entries."""
+        self.flush()
         rows = self.db.fetchall(
             """
-            SELECT * FROM audit_log
+            SELECT id, action, entity_type, entity_id, details, created_at
+            FROM audit_log
             ORDER BY created_at DESC
             LIMIT ?
             """,
@@ -147,11 +290,15 @@ class AuditRepository:
         entity_type: Optional[str] = None
     ) -> list[AuditEntry]:
         """Get audit entries within a date range."""
+        self.flush()
+        # Half-open range on the raw column (same rows as comparing
+        # DATE(created_at)), so idx_audit_created is used instead of a scan
         if entity_type:
             rows = self.db.fetchall(
                 """
-                SELECT * FROM audit_log
-                WHERE DATE(created_at) BETWEEN DATE(?) AND DATE(?)
+                SELECT id, action, entity_type, entity_id, details, created_at
+                FROM audit_log
+                WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
                 AND entity_type = ?
                 ORDER BY created_at DESC
                 """,
@@ -160,8 +307,9 @@ class AuditRepository:
         else:
             rows = self.db.fetchall(
                 """
-                SELECT * FROM audit_log
-                WHERE DATE(created_at) BETWEEN DATE(?) AND DATE(?)
+                SELECT id, action, entity_type, entity_id, details, created_at
+                FROM audit_log
+                WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
                 ORDER BY created_at DESC
                 """,
                 (start_date, end_date)
@@ -169,9 +317,9 @@ class AuditRepository:
         return [AuditEntry.from_row(row) for row in rows]
 
     # Convenience methods for common logging
-    def log_invoice_created(self, invoice_number: str, total: float) -> AuditEntry:
+    def log_invoice_created(self, invoice_number: str, total: float) -> None:
         """Log invoice creation."""
-        return self.log(
+        self.log(
             self.ACTION_CREATE,
             self.ENTITY_INVOICE,
             invoice_number,
@@ -183,46 +331,60 @@ class AuditRepository:
         invoice_number: str,
         item_ids: list[int],
         refund_amount: float
-    ) -> AuditEntry:
+    ) -> None:
         """Log invoice return."""
-        return self.log(
+        self.log(
             self.ACTION_RETURN,
             self.ENTITY_INVOICE,
             invoice_number,
             {'item_ids': item_ids, 'refund_amount': refund_amount}
         )
 
-    def log_receipt_printed(self, invoice_number: str) -> AuditEntry:
+    def log_receipt_printed(self, invoice_number: str) -> None:
         """Log receipt print."""
-        return self.log(
+        self.enqueue(
             self.ACTION_PRINT,
             self.ENTITY_INVOICE,
             invoice_number
         )
 
-    def log_receipt_emailed(self, invoice_number: str, email: str) -> AuditEntry:
+    def log_receipt_emailed(self, invoice_number: str, email: str) -> None:
         """Log receipt email."""
-        return self.log(
+        self.enqueue(
             self.ACTION_EMAIL,
             self.ENTITY_INVOICE,
             invoice_number,
             {'recipient': email}
         )
 
-    def log_product_imported(self, count: int, filename: str) -> AuditEntry:
+    def log_product_imported(self, count: int, filename: str) -> None:
         """Log product import."""
-        return self.log(
+        self.enqueue(
             self.ACTION_IMPORT,
             self.ENTITY_PRODUCT,
             None,
             {'count': count, 'filename': filename}
         )
 
-    def log_setting_changed(self, key: str, old_value: str, new_value: str) -> AuditEntry:
+    def log_setting_changed(self, key: str, old_value: str, new_value: str) -> None:
         """Log setting change."""
-        return self.log(
+        self.log(
             self.ACTION_SETTING_CHANGE,
             self.ENTITY_SETTING,
             key,
             {'old_value': old_value, 'new_value': new_value}
         )
+
+    def log_settings_changed(self, changes: dict[str, tuple[Optional[str], str]]) -> None:
+        """Log several setting changes (key -> (old, new)) as one entry."""
+        self.log(
+            self.ACTION_SETTING_CHANGE,
+            self.ENTITY_SETTING,
+            None,
+            {
+                'changes': {
+                    key: {'old_value': old_value, 'new_value': new_value}
+                    for key, (old_value, new_value) in changes.items()
+                }
+            }
+        )
@@ -0,0 +1,75 @@
+"""Email queue repository for receipts waiting to be sent."""
+
+from typing import Optional
+from dataclasses import dataclass, asdict
+
+from database.connection import Database
+
+
+@dataclass
+class QueuedEmail:
+    """Receipt email waiting for (or done with) delivery."""
+    invoice_id: int
+    email: str
+    status: str = "pending"
+    error: Optional[str] = None
+    id: Optional[int] = None
+    created_at: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return asdict(self)
+
+    @classmethod
+    def from_row(cls, row) -> 'QueuedEmail':
+        """Create QueuedEmail from database row."""
+        return cls(
+            id=row['id'],
+            invoice_id=row['invoice_id'],
+            email=row['email'],
+            status=row['status'],
+            error=row['error'],
+            created_at=row['created_at']
+        )
+
+
+class EmailQueueRepository:
+    """Repository for the persistent receipt email queue."""
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
+
+    def add(self, invoice_id: int, email: str) -> int:
+        """Queue a receipt email, returns the queue entry id."""
+        with self.db.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO email_queue (invoice_id, email) VALUES (?, ?)",
+                (invoice_id, email)
+            )
+            return cursor.lastrowid
+
+    def get_pending(self) -> list[QueuedEmail]:
+        """Get emails that have not been delivered or failed yet, oldest first."""
+        rows = self.db.fetchall(
+            "SELECT * FROM email_queue WHERE status = ? ORDER BY id",
+            (self.STATUS_PENDING,)
+        )
+        return [QueuedEmail.from_row(row) for row in rows]
+
+    def mark_sent(self, queue_id: int) -> None:
+        """Mark a queued email as delivered."""
+        self.db.execute(
+            "UPDATE email_queue SET status = ?, error = NULL WHERE id = ?",
+            (self.STATUS_SENT, queue_id)
+        )
+
+    def mark_failed(self, queue_id: int, error: Optional[str]) -> None:
+        """Mark a queued email as failed."""
+        self.db.execute(
+            "UPDATE email_queue SET status = ?, error = ? WHERE id = ?",
+            (self.STATUS_FAILED, error, queue_id)
+        )
@@ -1,13 +1,15 @@
 """Invoice repository for database operations."""
 
-from typing import Optional
-from dataclasses import dataclass, asdict, field
+from collections import defaultdict
+from typing import Iterator, Optional
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from functools import cached_property
 
 from database.connection import Database
 
 
-@dataclass
+@dataclass(slots=True)
 class InvoiceItem:
     """Invoice item entity."""
     product_id: str
@@ -22,24 +24,42 @@ class InvoiceItem:
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return asdict(self)
+        # Every field is a scalar, so asdict()'s recursive copy isn't needed
+        return {name: getattr(self, name) for name in _ITEM_FIELDS}
 
     @classmethod
     def from_row(cls, row) -> 'InvoiceItem':
-        """Create InvoiceItem from database row."""
+        """Create InvoiceItem from a database row selected as _ITEM_COLUMNS."""
+        (item_id, invoice_id, product_id, product_name, quantity,
+         unit_price, vat_rate, line_total, return_status) = row
         return cls(
-            id=row['id'],
-            invoice_id=row['invoice_id'],
-            product_id=row['product_id'],
-            product_name=row['product_name'],
-            quantity=row['quantity'],
-            unit_price=row['unit_price'],
-            vat_rate=row['vat_rate'],
-            line_total=row['line_total'],
-            return_status=row['return_status']
+            id=item_id,
+            invoice_id=invoice_id,
+            product_id=product_id,
+            product_name=product_name,
+            quantity=quantity,
+            unit_price=unit_price,
+            vat_rate=vat_rate,
+            line_total=line_total,
+            return_status=return_status
         )
 
 
+_ITEM_FIELDS = tuple(f.name for f in fields(InvoiceItem))
+
+# Column lists in the order from_row() unpacks them; rows are read by
+# position, which skips sqlite3.Row's by-name lookup for every field
+_ITEM_COLUMNS = (
+    "id, invoice_id, product_id, product_name, quantity, "
+    "unit_price, vat_rate, line_total, return_status"
+)
+_INVOICE_COLUMNS = (
+    "id, invoice_number, seller_id, store_name, subtotal, vat_amount, total, "
+    "payment_method, customer_email, previous_hash, current_hash, qr_data, "
+    "status, created_at, qr_image"
+)
+
+
 @dataclass
 class Invoice:
     """Invoice entity."""
@@ -57,36 +77,59 @@ class Invoice:
     previous_hash: Optional[str] = None
     status: str = "completed"
     created_at: Optional[str] = None
+    qr_image: Optional[str] = None
     items: list[InvoiceItem] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        """Convert to dictionary."""
-        data = asdict(self)
-        data['items'] = [item.to_dict() for item in self.items]
+        """
+        Convert to dictionary.
+
+        qr_image (a base64 PNG) is left out; endpoints that display the
+        image add it themselves.
+        """
+        # Copies of the cached item dicts (flat, so dict() is a full copy):
+        # callers may modify the result without touching the cache
+        data = {name: getattr(self, name) for name in _INVOICE_FIELDS}
+        data['items'] = [dict(item) for item in self.items_dicts]
         return data
 
+    @cached_property
+    def items_dicts(self) -> list[dict]:
+        """Item dictionaries, built once per instance for hashing and receipts."""
+        return [item.to_dict() for item in self.items]
+
     @classmethod
     def from_row(cls, row, items: list[InvoiceItem] = None) -> 'Invoice':
-        """Create Invoice from database row."""
+        """Create Invoice from a database row selected as _INVOICE_COLUMNS."""
+        (invoice_id, invoice_number, seller_id, store_name, subtotal,
+         vat_amount, total, payment_method, customer_email, previous_hash,
+         current_hash, qr_data, status, created_at, qr_image) = row
         return cls(
-            id=row['id'],
-            invoice_number=row['invoice_number'],
-            seller_id=row['seller_id'],
-            store_name=row['store_name'],
-            subtotal=row['subtotal'],
-            vat_amount=row['vat_amount'],
-            total=row['total'],
-            payment_method=row['payment_method'],
-            customer_email=row['customer_email'],
-            previous_hash=row['previous_hash'],
-            current_hash=row['current_hash'],
-            qr_data=row['qr_data'],
-            status=row['status'],
-            created_at=row['created_at'],
+            id=invoice_id,
+            invoice_number=invoice_number,
+            seller_id=seller_id,
+            store_name=store_name,
+            subtotal=subtotal,
+            vat_amount=vat_amount,
+            total=total,
+            payment_method=payment_method,
+            customer_email=customer_email,
+            previous_hash=previous_hash,
+            current_hash=current_hash,
+            qr_data=qr_data,
+            status=status,
+            created_at=created_at,
+            qr_image=qr_image,
             items=items or []
         )
 
 
+# Scalar fields in declaration order; items are added separately
+_INVOICE_FIELDS = tuple(
+    f.name for f in fields(Invoice) if f.name not in ('items', 'qr_image')
+)
+
+
 class InvoiceRepository:
     """Repository for invoice database operations."""
 
@@ -96,56 +139,114 @@ class InvoiceRepository:
     def get_by_id(self, invoice_id: int) -> Optional[Invoice]:
         """Get invoice by ID with items."""
         row = self.db.fetchone(
-            "SELECT * FROM invoices WHERE id = ?",
+            f"SELECT {_INVOICE_COLUMNS} FROM invoices WHERE id = ?",
             (invoice_id,)
         )
         if not row:
             return None
 
-        items = self._get_items(invoice_id)
+        items = self.get_items(invoice_id)
         return Invoice.from_row(row, items)
 
-    def get_by_number(self, invoice_number: str) -> Optional[Invoice]:
-        """Get invoice by invoice number with items."""
+    def get_by_number(
+        self,
+        invoice_number: str,
+        include_items: bool = True
+    ) -> Optional[Invoice]:
+        """
+        Get invoice by invoice number.
+
+        With include_items=False the items are left empty; callers that may
+        need them later load them with get_items().
+        """
         row = self.db.fetchone(
-            "SELECT * FROM invoices WHERE invoice_number = ?",
+            f"SELECT {_INVOICE_COLUMNS} FROM invoices WHERE invoice_number = ?",
             (invoice_number,)
         )
         if not row:
             return None
 
-        items = self._get_items(row['id'])
+        items = self.get_items(row['id']) if include_items else []
         return Invoice.from_row(row, items)
 
     def get_by_hash(self, current_hash: str) -> Optional[Invoice]:
         """Get invoice by its hash."""
         row = self.db.fetchone(
-            "SELECT * FROM invoices WHERE current_hash = ?",
+            f"SELECT {_INVOICE_COLUMNS} FROM invoices WHERE current_hash = ?",
             (current_hash,)
         )
         if not row:
             return None
 
-        items = self._get_items(row['id'])
+        items = self.get_items(row['id'])
         return Invoice.from_row(row, items)
 
-    def _get_items(self, invoice_id: int) -> list[InvoiceItem]:
+    def hash_exists(self, current_hash: str) -> bool:
+        """Check whether an invoice with this hash exists."""
+        row = self.db.fetchone(
+            "SELECT 1 FROM invoices WHERE current_hash = ? LIMIT 1",
+            (current_hash,)
+        )
+        return row is not None
+
+    def get_items(self, invoice_id: int) -> list[InvoiceItem]:
         """Get items for an invoice."""
         rows = self.db.fetchall(
-            "SELECT * FROM invoice_items WHERE invoice_id = ?",
+            f"SELECT {_ITEM_COLUMNS} FROM invoice_items WHERE invoice_id = ?",
             (invoice_id,)
         )
         return [InvoiceItem.from_row(row) for row in rows]
 
+    def iter_for_verification(self) -> Iterator[dict]:
+        """
+        Yield every invoice (oldest first) as a dict of the hash chain fields.
+
+        Each dict holds id, invoice_number, seller_id, total, created_at,
+        previous_hash, current_hash and items, where items are the hashed
+        item fields only. Rows map straight to dicts without building
+        Invoice objects, and invoices and items are read from two cursors
+        ordered by invoice ID and merged as they stream, so only one
+        invoice is held at a time.
+        """
+        item_rows = self.db.iterate(
+            """
+            SELECT invoice_id, product_id, quantity, unit_price, line_total
+            FROM invoice_items ORDER BY invoice_id ASC, id ASC
+            """
+        )
+        pending = next(item_rows, None)
+
+        invoice_rows = self.db.iterate(
+            """
+            SELECT id, invoice_number, seller_id, total, created_at,
+                   previous_hash, current_hash
+            FROM invoices ORDER BY id ASC
+            """
+        )
+        for row in invoice_rows:
+            items = []
+            while pending is not None and pending['invoice_id'] <= row['id']:
+                if pending['invoice_id'] == row['id']:
+                    items.append({
+                        'product_id': pending['product_id'],
+                        'quantity': pending['quantity'],
+                        'unit_price': pending['unit_price'],
+                        'line_total': pending['line_total'],
+                    })
+                pending = next(item_rows, None)
+            invoice = dict(row)
+            invoice['items'] = items
+            yield invoice
+
     def get_latest(self) -> Optional[Invoice]:
         """Get the most recent invoice."""
         row = self.db.fetchone(
-            "SELECT * FROM invoices ORDER BY id DESC LIMIT 1"
+            f"SELECT {_INVOICE_COLUMNS} FROM invoices ORDER BY id DESC LIMIT 1"
         )
         if not row:
             return None
 
-        items = self._get_items(row['id'])
+        items = self.get_items(row['id'])
         return Invoice.from_row(row, items)
 
     def get_latest_hash(self) -> str:
@@ -157,57 +258,58 @@ class InvoiceRepository:
 
     def create(self, invoice: Invoice) -> Invoice:
         """Create a new invoice with items."""
-        # Insert invoice
-        cursor = self.db.connection.cursor()
-        cursor.execute(
-            """
-            INSERT INTO invoices (
-                invoice_number, seller_id, store_name, subtotal, vat_amount,
-                total, payment_method, customer_email, previous_hash,
-                current_hash, qr_data, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                invoice.invoice_number,
-                invoice.seller_id,
-                invoice.store_name,
-                invoice.subtotal,
-                invoice.vat_amount,
-                invoice.total,
-                invoice.payment_method,
-                invoice.customer_email,
-                invoice.previous_hash,
-                invoice.current_hash,
-                invoice.qr_data,
-                invoice.status
+        with self.db.cursor() as cursor:
+            # Insert invoice
+            cursor.execute(
+                """
+                INSERT INTO invoices (
+                    invoice_number, seller_id, store_name, subtotal, vat_amount,
+                    total, payment_method, customer_email, previous_hash,
+                    current_hash, qr_data, qr_image, status, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                """,
+                (
+                    invoice.invoice_number,
+                    invoice.seller_id,
+                    invoice.store_name,
+                    invoice.subtotal,
+                    invoice.vat_amount,
+                    invoice.total,
+                    invoice.payment_method,
+                    invoice.customer_email,
+                    invoice.previous_hash,
+                    invoice.current_hash,
+                    invoice.qr_data,
+                    invoice.qr_image,
+                    invoice.status,
+                    invoice.created_at
+                )
             )
-        )
-        invoice_id = cursor.lastrowid
+            invoice_id = cursor.lastrowid
 
-        # Insert items
-        for item in invoice.items:
-            cursor.execute(
+            # Insert items in one batch
+            cursor.executemany(
                 """
                 INSERT INTO invoice_items (
                     invoice_id, product_id, product_name, quantity,
                     unit_price, vat_rate, line_total, return_status
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    invoice_id,
-                    item.product_id,
-                    item.product_name,
-                    item.quantity,
-                    item.unit_price,
-                    item.vat_rate,
-                    item.line_total,
-                    item.return_status
-                )
+                [
+                    (
+                        invoice_id,
+                        item.product_id,
+                        item.product_name,
+                        item.quantity,
+                        item.unit_price,
+                        item.vat_rate,
+                        item.line_total,
+                        item.return_status
+                    )
+                    for item in invoice.items
+                ]
             )
 
-        self.db.connection.commit()
-        cursor.close()
-
         return self.get_by_id(invoice_id)
 
     def update_status(self, invoice_id: int, status: str) -> Optional[Invoice]:
@@ -218,6 +320,13 @@ class InvoiceRepository:
         )
         return self.get_by_id(invoice_id)
 
+    def set_qr_image(self, invoice_id: int, qr_image: str) -> None:
+        """Store the rendered QR image for an invoice created before it was persisted."""
+        self.db.execute(
+            "UPDATE invoices SET qr_image = ? WHERE id = ?",
+            (qr_image, invoice_id)
+        )
+
     def mark_item_returned(self, item_id: int) -> bool:
         """Mark an invoice item as returned."""
         self.db.execute(
@@ -226,6 +335,17 @@ class InvoiceRepository:
         )
         return True
 
+    def mark_items_returned_bulk(self, item_ids: list[int]) -> None:
+        """Mark several invoice items as returned in one statement."""
+        if not item_ids:
+            return
+
+        placeholders = ','.join('?' * len(item_ids))
+        self.db.execute(
+            f"UPDATE invoice_items SET return_status = 'returned' WHERE id IN ({placeholders})",
+            tuple(item_ids)
+        )
+
     def get_all_hashes(self) -> list[tuple[int, str, str]]:
         """Get all invoice hashes for chain verification."""
         rows = self.db.fetchall(
@@ -263,24 +383,44 @@ class InvoiceRepository:
     def get_by_date_range(self, start_date: str, end_date: str) -> list[Invoice]:
         """Get invoices within a date range."""
         rows = self.db.fetchall(
-            """
-            SELECT * FROM invoices
-            WHERE DATE(created_at) BETWEEN DATE(?) AND DATE(?)
+            f"""
+            SELECT {_INVOICE_COLUMNS} FROM invoices
+            WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
             ORDER BY created_at DESC
             """,
             (start_date, end_date)
         )
-        invoices = []
-        for row in rows:
-            items = self._get_items(row['id'])
-            invoices.append(Invoice.from_row(row, items))
-        return invoices
+        if not rows:
+            return []
+
+        # Items for the whole range in one query (selected with the same
+        # filter rather than an IN list, which has a bound-parameter limit)
+        item_rows = self.db.fetchall(
+            f"""
+            SELECT {_ITEM_COLUMNS} FROM invoice_items
+            WHERE invoice_id IN (
+                SELECT id FROM invoices
+                WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
+            )
+            ORDER BY invoice_id, id
+            """,
+            (start_date, end_date)
+        )
+        items_by_invoice = defaultdict(list)
+        for item_row in item_rows:
+            item = InvoiceItem.from_row(item_row)
+            items_by_invoice[item.invoice_id].append(item)
+
+        return [Invoice.from_row(row, items_by_invoice[row['id']]) for row in rows]
 
     def count_by_date(self, date: str) -> int:
         """Count invoices for a specific date."""
         row = self.db.fetchone(
-            "SELECT COUNT(*) as count FROM invoices WHERE DATE(created_at) = DATE(?)",
-            (date,)
+            """
+            SELECT COUNT(*) as count FROM invoices
+            WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
+            """,
+            (date, date)
         )
         return row['count'] if row else 0
 
@@ -290,8 +430,9 @@ class InvoiceRepository:
             """
             SELECT COALESCE(SUM(total), 0) as total
             FROM invoices
-            WHERE DATE(created_at) = DATE(?) AND status != 'returned'
+            WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
+            AND status != 'returned'
             """,
-            (date,)
+            (date, date)
         )
         return row['total'] if row else 0.0
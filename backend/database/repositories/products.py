@@ -1,15 +1,22 @@
 """Product repository for database operations."""
 
+import threading
+from collections import OrderedDict
 from typing import Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime
 
 from database.connection import Database
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Product:
-    """Product entity."""
+    """
+    Product entity.
+
+    Frozen because ProductRepository hands the same cached instance to
+    every caller; build a changed copy with dataclasses.replace().
+    """
     id: str
     name: str
     price: float
@@ -22,62 +29,183 @@ class Product:
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
-        return asdict(self)
+        # Every field is a scalar, so asdict()'s recursive copy isn't needed
+        return {name: getattr(self, name) for name in _PRODUCT_FIELDS}
 
     @classmethod
     def from_row(cls, row) -> 'Product':
-        """Create Product from database row."""
+        """Create Product from a database row selected as _PRODUCT_COLUMNS."""
+        (product_id, name, description, price, vat_rate,
+         barcode, stock, status, created_at) = row
         return cls(
-            id=row['id'],
-            name=row['name'],
-            description=row['description'] or "",
-            price=row['price'],
-            vat_rate=row['vat_rate'],
-            barcode=row['barcode'],
-            stock=row['stock'],
-            status=row['status'],
-            created_at=row['created_at']
+            id=product_id,
+            name=name,
+            description=description or "",
+            price=price,
+            vat_rate=vat_rate,
+            barcode=barcode,
+            stock=stock,
+            status=status,
+            created_at=created_at
         )
 
 
+_PRODUCT_FIELDS = tuple(f.name for f in fields(Product))
+
+# Column list in the order from_row() unpacks it (rows are read by position)
+_PRODUCT_COLUMNS = (
+    "id, name, description, price, vat_rate, barcode, stock, status, created_at"
+)
+
+
 class ProductRepository:
     """Repository for product database operations."""
 
+    # Products kept in the lookup cache; scanning at a till repeats the same
+    # few products, so a small LRU absorbs most barcode/ID reads
+    CACHE_SIZE = 512
+
     def __init__(self, db: Database = None):
         self.db = db or Database()
+        self._cache: OrderedDict[str, Product] = OrderedDict()
+        self._barcode_ids: dict[str, str] = {}
+        self._cache_lock = threading.Lock()
+        # Bumped on every invalidation; reads that started before one are not cached
+        self._generation = 0
+
+    def _cached(self, product_id: str) -> Optional[Product]:
+        """Cached product for an ID, marking it recently used."""
+        with self._cache_lock:
+            product = self._cache.get(product_id)
+            if product is not None:
+                self._cache.move_to_end(product_id)
+            return product
+
+    def _remember(self, product: Product, generation: int) -> None:
+        """Cache a product just read, unless it may be stale or uncommitted."""
+        if self.db.in_transaction:
+            return
+        with self._cache_lock:
+            if generation != self._generation:
+                return
+            self._cache[product.id] = product
+            self._cache.move_to_end(product.id)
+            if product.barcode:
+                self._barcode_ids[product.barcode] = product.id
+            while len(self._cache) > self.CACHE_SIZE:
+                _, evicted = self._cache.popitem(last=False)
+                if evicted.barcode and self._barcode_ids.get(evicted.barcode) == evicted.id:
+                    del self._barcode_ids[evicted.barcode]
+
+    def _forget(self, product_ids, barcodes=()) -> None:
+        """
+        Drop products from the cache now and again once the current
+        transaction ends, so a concurrent read cannot re-cache old values.
+        """
+        product_ids = list(product_ids)
+        barcodes = [barcode for barcode in barcodes if barcode]
+
+        def drop():
+            with self._cache_lock:
+                self._generation += 1
+                for product_id in product_ids:
+                    product = self._cache.pop(product_id, None)
+                    if product and product.barcode:
+                        self._barcode_ids.pop(product.barcode, None)
+                for barcode in barcodes:
+                    self._barcode_ids.pop(barcode, None)
+
+        drop()
+        self.db.after_transaction(drop)
+
+    def invalidate(self) -> None:
+        """Drop every cached product."""
+        with self._cache_lock:
+            self._generation += 1
+            self._cache.clear()
+            self._barcode_ids.clear()
 
     def get_all(self, include_inactive: bool = False) -> list[Product]:
         """Get all products, optionally including inactive."""
         if include_inactive:
-            query = "SELECT * FROM products ORDER BY name"
+            query = f"SELECT {_PRODUCT_COLUMNS} FROM products ORDER BY name"
             rows = self.db.fetchall(query)
         else:
-            query = "SELECT * FROM products WHERE status = 'active' ORDER BY name"
+            query = (
+                f"SELECT {_PRODUCT_COLUMNS} FROM products "
+                "WHERE status = 'active' ORDER BY name"
+            )
             rows = self.db.fetchall(query)
         return [Product.from_row(row) for row in rows]
 
     def get_by_id(self, product_id: str) -> Optional[Product]:
         """Get product by ID."""
+        product = self._cached(product_id)
+        if product is not None:
+            return product
+
+        generation = self._generation
         row = self.db.fetchone(
-            "SELECT * FROM products WHERE id = ?",
+            f"SELECT {_PRODUCT_COLUMNS} FROM products WHERE id = ?",
             (product_id,)
         )
-        return Product.from_row(row) if row else None
+        if not row:
+            return None
+        product = Product.from_row(row)
+        self._remember(product, generation)
+        return product
+
+    def get_by_ids(self, product_ids: list[str]) -> dict[str, Product]:
+        """Get several products in one query, keyed by ID."""
+        products = {}
+        missing = []
+        for product_id in dict.fromkeys(product_ids):
+            product = self._cached(product_id)
+            if product is not None:
+                products[product_id] = product
+            else:
+                missing.append(product_id)
+        if not missing:
+            return products
+
+        generation = self._generation
+        placeholders = ','.join('?' * len(missing))
+        rows = self.db.fetchall(
+            f"SELECT {_PRODUCT_COLUMNS} FROM products WHERE id IN ({placeholders})",
+            tuple(missing)
+        )
+        for row in rows:
+            product = Product.from_row(row)
+            self._remember(product, generation)
+            products[product.id] = product
+        return products
 
     def get_by_barcode(self, barcode: str) -> Optional[Product]:
         """Get product by barcode."""
+        with self._cache_lock:
+            product_id = self._barcode_ids.get(barcode)
+        if product_id is not None:
+            product = self._cached(product_id)
+            if product is not None and product.barcode == barcode:
+                return product
+
+        generation = self._generation
         row = self.db.fetchone(
-            "SELECT * FROM products WHERE barcode = ?",
+            f"SELECT {_PRODUCT_COLUMNS} FROM products WHERE barcode = ?",
             (barcode,)
         )
-        return Product.from_row(row) if row else None
+        if not row:
+            return None
+        product = Product.from_row(row)
+        self._remember(product, generation)
+        return product
 
     def search(self, query: str) -> list[Product]:
         """Search products by name or barcode."""
         search_term = f"%{query}%"
         rows = self.db.fetchall(
-            """
-            SELECT * FROM products
+            f"""
+            SELECT {_PRODUCT_COLUMNS} FROM products
             WHERE status = 'active'
             AND (name LIKE ? OR barcode LIKE ? OR id LIKE ?)
             ORDER BY name
@@ -105,8 +233,65 @@ class ProductRepository:
                 product.status
             )
         )
+        self._forget([product.id], [product.barcode])
         return self.get_by_id(product.id)
 
+    def bulk_insert(self, products: list[Product]) -> None:
+        """Insert several products with one executemany and a single commit."""
+        if not products:
+            return
+
+        with self.db.transaction():
+            self.db.executemany(
+                """
+                INSERT INTO products (id, name, description, price, vat_rate, barcode, stock, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        product.id,
+                        product.name,
+                        product.description,
+                        product.price,
+                        product.vat_rate,
+                        product.barcode,
+                        product.stock,
+                        product.status
+                    )
+                    for product in products
+                ]
+            )
+            self._forget([p.id for p in products], [p.barcode for p in products])
+
+    def bulk_update(self, products: list[Product]) -> None:
+        """Update several existing products with one executemany and a single commit."""
+        if not products:
+            return
+
+        with self.db.transaction():
+            self.db.executemany(
+                """
+                UPDATE products
+                SET name = ?, description = ?, price = ?, vat_rate = ?,
+                    barcode = ?, stock = ?, status = ?
+                WHERE id = ?
+                """,
+                [
+                    (
+                        product.name,
+                        product.description,
+                        product.price,
+                        product.vat_rate,
+                        product.barcode,
+                        product.stock,
+                        product.status,
+                        product.id
+                    )
+                    for product in products
+                ]
+            )
+            self._forget([p.id for p in products], [p.barcode for p in products])
+
     def update(self, product: Product) -> Product:
         """Update an existing product."""
         self.db.execute(
@@ -127,6 +312,7 @@ class ProductRepository:
                 product.id
             )
         )
+        self._forget([product.id], [product.barcode])
         return self.get_by_id(product.id)
 
     def delete(self, product_id: str) -> bool:
@@ -135,6 +321,7 @@ class ProductRepository:
             "UPDATE products SET status = 'inactive' WHERE id = ?",
             (product_id,)
         )
+        self._forget([product_id])
         return True
 
     def hard_delete(self, product_id: str) -> bool:
@@ -143,6 +330,7 @@ class ProductRepository:
             "DELETE FROM products WHERE id = ?",
             (product_id,)
         )
+        self._forget([product_id])
         return True
 
     def update_stock(self, product_id: str, quantity_change: int) -> Optional[Product]:
@@ -151,8 +339,33 @@ class ProductRepository:
             "UPDATE products SET stock = stock + ? WHERE id = ?",
             (quantity_change, product_id)
         )
+        self._forget([product_id])
         return self.get_by_id(product_id)
 
+    # Products per UPDATE ... CASE statement; 3 bound parameters each keeps
+    # the statement under SQLite's 999 variable limit on older builds
+    STOCK_UPDATE_CHUNK = 300
+
+    def update_stock_bulk(self, deltas: dict[str, int]) -> None:
+        """Apply several stock deltas (product_id -> change) in one statement."""
+        if not deltas:
+            return
+
+        items = list(deltas.items())
+        with self.db.transaction():
+            for start in range(0, len(items), self.STOCK_UPDATE_CHUNK):
+                chunk = items[start:start + self.STOCK_UPDATE_CHUNK]
+                cases = ' '.join('WHEN ? THEN ?' for _ in chunk)
+                placeholders = ','.join('?' * len(chunk))
+                params = [value for pair in chunk for value in pair]
+                params.extend(product_id for product_id, _ in chunk)
+                self.db.execute(
+                    f"UPDATE products SET stock = stock + CASE id {cases} END "
+                    f"WHERE id IN ({placeholders})",
+                    tuple(params)
+                )
+            self._forget(deltas)
+
     def bulk_create(self, products: list[Product]) -> int:
         """Bulk create products, returns count of created."""
         created = 0
@@ -6,19 +6,59 @@ import json
 from database.connection import Database
 
 
+# Settings that get_all_typed() converts from their stored string form
+_TYPED_SETTINGS = {
+    'printer_enabled': bool,
+    'auto_save_pdf': bool,
+    'smtp_port': int,
+    'smtp_use_tls': bool,
+    'default_vat_rate': float,
+}
+
+
 class SettingsRepository:
     """Repository for application settings."""
 
     def __init__(self, db: Database = None):
         self.db = db or Database()
+        self._cache: Optional[dict[str, str]] = None
+
+    def _values(self) -> dict[str, str]:
+        """Raw setting values, loaded from the database on first use."""
+        if self._cache is None:
+            rows = self.db.fetchall("SELECT key, value FROM settings")
+            self._cache = {row['key']: row['value'] for row in rows}
+        return self._cache
+
+    def invalidate(self) -> None:
+        """Drop cached values so the next read reloads them from the database."""
+        self._cache = None
+
+    def _invalidate_for_transaction(self) -> None:
+        """
+        Drop cached values now and again when the open transaction ends.
+
+        Reads later in the transaction may reload uncommitted values, which
+        must not outlive a rollback.
+        """
+        self.invalidate()
+        self.db.after_transaction(self.invalidate)
+
+    def _remember(self, values: dict[str, str]) -> None:
+        """Record values just written, unless an enclosing transaction may still roll back."""
+        if self.db.in_transaction:
+            self._invalidate_for_transaction()
+        else:
+            self._values().update(values)
 
     def get(self, key: str) -> Optional[str]:
         """Get a single setting value."""
-        row = self.db.fetchone(
-            "SELECT value FROM settings WHERE key = ?",
-            (key,)
-        )
-        return row['value'] if row else None
+        return self._values().get(key)
+
+    def get_many(self, keys) -> dict[str, Optional[str]]:
+        """Get several setting values at once (None for missing keys)."""
+        values = self._values()
+        return {key: values.get(key) for key in keys}
 
     def get_typed(self, key: str, type_func: callable = str, default: Any = None) -> Any:
         """Get a setting with type conversion."""
@@ -34,25 +74,14 @@ class SettingsRepository:
 
     def get_all(self) -> dict[str, str]:
         """Get all settings as a dictionary."""
-        rows = self.db.fetchall("SELECT key, value FROM settings")
-        return {row['key']: row['value'] for row in rows}
+        return dict(self._values())
 
     def get_all_typed(self) -> dict[str, Any]:
         """Get all settings with appropriate type conversion."""
-        raw = self.get_all()
-
-        # Define type mappings
-        type_map = {
-            'printer_enabled': bool,
-            'smtp_port': int,
-            'smtp_use_tls': bool,
-            'default_vat_rate': float,
-        }
-
         result = {}
-        for key, value in raw.items():
-            if key in type_map:
-                type_func = type_map[key]
+        for key, value in self.get_all().items():
+            type_func = _TYPED_SETTINGS.get(key)
+            if type_func is not None:
                 if type_func == bool:
                     result[key] = value.lower() in ('true', '1', 'yes')
                 else:
@@ -65,23 +94,38 @@ class SettingsRepository:
 
         return result
 
+    @staticmethod
+    def _to_stored(value: Any) -> str:
+        """Convert a setting value to its stored string form."""
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if not isinstance(value, str):
+            return str(value)
+        return value
+
     def set(self, key: str, value: Any) -> None:
         """Set a single setting value."""
-        # Convert non-string values
-        if isinstance(value, bool):
-            value = 'true' if value else 'false'
-        elif not isinstance(value, str):
-            value = str(value)
+        value = self._to_stored(value)
 
         self.db.execute(
             "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
             (key, value)
         )
+        self._remember({key: value})
 
     def set_many(self, settings: dict[str, Any]) -> None:
         """Set multiple settings at once."""
-        for key, value in settings.items():
-            self.set(key, value)
+        stored = {key: self._to_stored(value) for key, value in settings.items()}
+        if not stored:
+            return
+
+        with self.db.transaction():
+            self.db.executemany(
+                """INSERT INTO settings (key, value) VALUES (?, ?)
+                   ON CONFLICT(key) DO UPDATE SET value = excluded.value""",
+                list(stored.items())
+            )
+        self._remember(stored)
 
     def delete(self, key: str) -> bool:
         """Delete a setting."""
@@ -89,6 +133,7 @@ class SettingsRepository:
             "DELETE FROM settings WHERE key = ?",
             (key,)
         )
+        self._invalidate_for_transaction()
         return True
 
     # Convenience methods for common settings
@@ -124,6 +169,14 @@ class SettingsRepository:
     def printer_enabled(self, value: bool):
         self.set('printer_enabled', value)
 
+    @property
+    def auto_save_pdf(self) -> bool:
+        return self.get_typed('auto_save_pdf', bool, True)
+
+    @auto_save_pdf.setter
+    def auto_save_pdf(self, value: bool):
+        self.set('auto_save_pdf', value)
+
     @property
     def currency_symbol(self) -> str:
         return self.get('currency_symbol') or '€'
@@ -87,6 +87,9 @@ def main():
         http_server=not frontend_path.exists(),  # Use HTTP server for dev
     )
 
+    # Window closed: write out anything still queued
+    api.shutdown()
+
 
 if __name__ == '__main__':
     main()
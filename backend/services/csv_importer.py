@@ -70,6 +70,9 @@ class CSVImporter:
         'upc': 'barcode',
     }
 
+    # Products written per transaction
+    BATCH_SIZE = 1000
+
     def __init__(self, product_repository):
         """
         Initialize importer.
@@ -157,10 +160,17 @@ class CSVImporter:
         skip_duplicates: bool,
         update_existing: bool
     ) -> ImportResult:
-        """Process CSV rows and import products."""
+        """Process CSV rows and import products in batches."""
+        from database.repositories.products import Product
+
         result = ImportResult(success=True)
         errors = []
 
+        # Products waiting for the next flush, keyed by ID:
+        # id -> [product, is_new, row numbers that produced it]
+        pending: dict[str, list] = {}
+        pending_barcodes: dict[str, str] = {}
+
         for row_num, row in enumerate(reader, start=2):  # Start at 2 (1 is header)
             result.total_rows += 1
 
@@ -172,17 +182,12 @@ class CSVImporter:
                 result.skipped += 1
                 continue
 
-            # Check for existing product
-            existing = None
-            if product_data.get('barcode'):
-                existing = self.product_repo.get_by_barcode(product_data['barcode'])
-            if not existing and product_data.get('id'):
-                existing = self.product_repo.get_by_id(product_data['id'])
+            # Check for existing product, including ones not yet written
+            existing = self._find_existing(product_data, pending, pending_barcodes)
 
             if existing:
                 if update_existing:
                     # Update existing product
-                    from database.repositories.products import Product
                     product = Product(
                         id=existing.id,
                         name=product_data['name'],
@@ -193,8 +198,16 @@ class CSVImporter:
                         stock=product_data.get('stock', 0),
                         status=product_data.get('status', 'active')
                     )
-                    self.product_repo.update(product)
-                    result.imported += 1
+                    entry = pending.get(product.id)
+                    if entry:
+                        if entry[0].barcode:
+                            pending_barcodes.pop(entry[0].barcode, None)
+                        entry[0] = product
+                        entry[2].append(row_num)
+                    else:
+                        pending[product.id] = [product, False, [row_num]]
+                    if product.barcode:
+                        pending_barcodes[product.barcode] = product.id
                 elif skip_duplicates:
                     result.skipped += 1
                 else:
@@ -206,8 +219,6 @@ class CSVImporter:
                     result.skipped += 1
             else:
                 # Create new product
-                from database.repositories.products import Product
-
                 product_id = product_data.get('id') or self._generate_id()
 
                 product = Product(
@@ -220,17 +231,15 @@ class CSVImporter:
                     stock=product_data.get('stock', 0),
                     status=product_data.get('status', 'active')
                 )
+                pending[product.id] = [product, True, [row_num]]
+                if product.barcode:
+                    pending_barcodes[product.barcode] = product.id
 
-                try:
-                    self.product_repo.create(product)
-                    result.imported += 1
-                except Exception as e:
-                    errors.append(ImportError(
-                        row=row_num,
-                        field='',
-                        message=str(e)
-                    ))
-                    result.skipped += 1
+            if len(pending) >= self.BATCH_SIZE:
+                self._flush(pending, result, errors)
+                pending_barcodes.clear()
+
+        self._flush(pending, result, errors)
 
         result.errors = errors
         result.success = result.imported > 0 or result.total_rows == 0
@@ -238,6 +247,57 @@ class CSVImporter:
 
         return result
 
+    def _find_existing(self, product_data: dict, pending: dict, pending_barcodes: dict):
+        """Find the product a row refers to, preferring unflushed versions."""
+        barcode = product_data.get('barcode')
+        if barcode:
+            if barcode in pending_barcodes:
+                return pending[pending_barcodes[barcode]][0]
+            existing = self.product_repo.get_by_barcode(barcode)
+            if existing:
+                return pending[existing.id][0] if existing.id in pending else existing
+
+        product_id = product_data.get('id')
+        if product_id:
+            if product_id in pending:
+                return pending[product_id][0]
+            return self.product_repo.get_by_id(product_id)
+
+        return None
+
+    def _flush(self, pending: dict, result: ImportResult, errors: list) -> None:
+        """Write pending products in one transaction, row by row if that fails."""
+        if not pending:
+            return
+
+        entries = list(pending.values())
+        pending.clear()
+
+        try:
+            with self.product_repo.db.transaction():
+                self.product_repo.bulk_insert([p for p, is_new, _ in entries if is_new])
+                self.product_repo.bulk_update([p for p, is_new, _ in entries if not is_new])
+            result.imported += sum(len(rows) for _, _, rows in entries)
+            return
+        except Exception:
+            pass
+
+        # Retry one product at a time so a single bad row is reported on its own
+        for product, is_new, rows in entries:
+            try:
+                if is_new:
+                    self.product_repo.create(product)
+                else:
+                    self.product_repo.update(product)
+                result.imported += len(rows)
+            except Exception as e:
+                errors.append(ImportError(
+                    row=rows[-1],
+                    field='',
+                    message=str(e)
+                ))
+                result.skipped += len(rows)
+
     def _parse_row(self, row: dict, row_num: int) -> tuple[dict, list[ImportError]]:
         """Parse and validate a single row."""
         data = {}
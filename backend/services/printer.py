@@ -8,7 +8,9 @@ from datetime import datetime
 import subprocess
 import sys
 import os
+import re
 import struct
+import time
 
 try:
     from escpos.printer import Usb
@@ -80,6 +82,46 @@ class PrinterNotConnectedError(Exception):
     pass
 
 
+# Windows USB printer ports rarely change; one PowerShell start costs ~100ms+
+USB_PORTS_CACHE_SECONDS = 30
+_usb_ports_cache: Optional[tuple[float, list[str]]] = None
+
+
+def list_usb_printer_ports() -> list[str]:
+    """
+    List Windows USB printer ports (USB001, USB002, ...).
+
+    All ports come from a single Get-PrinterPort call, and the result is
+    cached for USB_PORTS_CACHE_SECONDS.
+    """
+    global _usb_ports_cache
+
+    now = time.monotonic()
+    if _usb_ports_cache and now - _usb_ports_cache[0] < USB_PORTS_CACHE_SECONDS:
+        return list(_usb_ports_cache[1])
+
+    ports = []
+    try:
+        result = subprocess.run(
+            ['powershell', '-NoProfile', '-Command',
+             "Get-PrinterPort -ErrorAction SilentlyContinue | "
+             "Where-Object { $_.Name -like 'USB*' } | Select-Object -ExpandProperty Name"],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        if result.returncode == 0:
+            ports = sorted(
+                name for name in (line.strip() for line in result.stdout.splitlines())
+                if re.fullmatch(r'USB\d{3}', name)
+            )
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+    _usb_ports_cache = (now, ports)
+    return list(ports)
+
+
 class WindowsRawPrinter:
     """
     Windows raw printer for sending ESC/POS commands via Windows spooler.
@@ -135,27 +177,8 @@ class WindowsRawPrinter:
 
     def _find_usb_port(self) -> Optional[str]:
         """Find a USB printer port."""
-        try:
-            # Check for USB001-USB009
-            for i in range(1, 10):
-                port = f"USB{i:03d}"
-                # Try to open the port to verify it exists
-                try:
-                    # Check if port exists via printer ports
-                    result = subprocess.run(
-                        ['powershell', '-NoProfile', '-Command',
-                         f"Get-PrinterPort -Name '{port}' -ErrorAction SilentlyContinue | Select-Object -ExpandProperty Name"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode == 0 and port in result.stdout:
-                        return port
-                except:
-                    pass
-        except:
-            pass
-        return None
+        ports = list_usb_printer_ports()
+        return ports[0] if ports else None
 
     def _find_pos_printer(self) -> Optional[str]:
         """Find a POS/thermal printer in Windows."""
@@ -78,10 +78,10 @@ class ReportsService:
                 COALESCE(SUM(total), 0) as total_sales,
                 COUNT(*) as invoice_count
             FROM invoices
-            WHERE DATE(created_at) = DATE(?)
+            WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
             AND status != 'returned'
             """,
-            (date,)
+            (date, date)
         )
 
         total_sales = row['total_sales'] if row else 0
@@ -96,11 +96,11 @@ class ReportsService:
                 COALESCE(SUM(total), 0) as total,
                 COUNT(*) as count
             FROM invoices
-            WHERE DATE(created_at) = DATE(?)
+            WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
             AND status != 'returned'
             GROUP BY payment_method
             """,
-            (date,)
+            (date, date)
         )
 
         by_payment = {
@@ -130,23 +130,6 @@ class ReportsService:
         Returns:
             PeriodReport with daily breakdown
         """
-        # Total for period
-        row = self.db.fetchone(
-            """
-            SELECT
-                COALESCE(SUM(total), 0) as total_sales,
-                COUNT(*) as invoice_count
-            FROM invoices
-            WHERE DATE(created_at) BETWEEN DATE(?) AND DATE(?)
-            AND status != 'returned'
-            """,
-            (start_date, end_date)
-        )
-
-        total_sales = row['total_sales'] if row else 0
-        invoice_count = row['invoice_count'] if row else 0
-        average_sale = total_sales / invoice_count if invoice_count > 0 else 0
-
         # Daily breakdown
         daily_rows = self.db.fetchall(
             """
@@ -155,7 +138,7 @@ class ReportsService:
                 COALESCE(SUM(total), 0) as total_sales,
                 COUNT(*) as invoice_count
             FROM invoices
-            WHERE DATE(created_at) BETWEEN DATE(?) AND DATE(?)
+            WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
             AND status != 'returned'
             GROUP BY DATE(created_at)
             ORDER BY date
@@ -173,6 +156,12 @@ class ReportsService:
             for row in daily_rows
         ]
 
+        # Period totals are rolled up from the daily rows rather than
+        # scanning the invoices a second time
+        total_sales = sum(day.total_sales for day in daily_breakdown)
+        invoice_count = sum(day.invoice_count for day in daily_breakdown)
+        average_sale = total_sales / invoice_count if invoice_count > 0 else 0
+
         # Payment method breakdown
         payment_rows = self.db.fetchall(
             """
@@ -181,7 +170,7 @@ class ReportsService:
                 COALESCE(SUM(total), 0) as total,
                 COUNT(*) as count
             FROM invoices
-            WHERE DATE(created_at) BETWEEN DATE(?) AND DATE(?)
+            WHERE created_at >= DATE(?) AND created_at < DATE(?, '+1 day')
             AND status != 'returned'
             GROUP BY payment_method
             """,
@@ -237,7 +226,7 @@ class ReportsService:
                     SUM(ii.line_total) as revenue
                 FROM invoice_items ii
                 JOIN invoices i ON ii.invoice_id = i.id
-                WHERE DATE(i.created_at) BETWEEN DATE(?) AND DATE(?)
+                WHERE i.created_at >= DATE(?) AND i.created_at < DATE(?, '+1 day')
                 AND i.status != 'returned'
                 AND ii.return_status = 'none'
                 GROUP BY ii.product_id, ii.product_name
@@ -328,19 +317,21 @@ class ReportsService:
         else:
             raise ValueError(f"Unknown report type: {report_type}")
 
-        # Generate CSV
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerows(rows)
-        csv_content = output.getvalue()
-
+        # Write straight to the file when given one, so the CSV is never held
+        # in memory as a single string
         if output_path:
             path = Path(output_path)
-            path.write_text(csv_content)
+            with path.open('w', newline='', encoding='utf-8') as output:
+                writer = csv.writer(output)
+                writer.writerow(headers)
+                writer.writerows(rows)
             return str(path)
 
-        return csv_content
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(headers)
+        writer.writerows(rows)
+        return output.getvalue()
 
     def get_today_summary(self) -> dict:
         """Get quick summary for today."""
@@ -0,0 +1,52 @@
+"""Shared fixtures: a fresh database file and API instance per test."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules import each other relative to backend/, as when run from main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.connection import Database  # noqa: E402
+from database.migrations import initialize_database  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Database singleton pointed at an empty, migrated file."""
+    Database.reset()
+    database = Database(tmp_path / 'test.db')
+    initialize_database(database)
+    yield database
+    Database.reset()
+
+
+@pytest.fixture
+def api(db, tmp_path, monkeypatch):
+    """API backed by the test database, writing receipts under tmp_path."""
+    from api import bridge
+
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path))
+    monkeypatch.setenv('APPDATA', str(tmp_path))
+    bridge._user_data_dir.cache_clear()
+
+    instance = bridge.API()
+    yield instance
+    instance.shutdown()
+    bridge._user_data_dir.cache_clear()
+
+
+@pytest.fixture
+def stocked_api(api):
+    """API with two products in stock."""
+    for product_id, price in (('P1', 2.50), ('P2', 10.00)):
+        result = api.products_create({
+            'id': product_id,
+            'name': f'Product {product_id}',
+            'price': price,
+            'stock': 10,
+        })
+        assert result['success'], result
+    return api
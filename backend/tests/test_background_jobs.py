@@ -0,0 +1,183 @@
+"""Background work: the API job table, the email queue and the audit writer."""
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from database.repositories.audit import AuditRepository
+
+
+def wait_for_job(status, job_id, timeout=10.0):
+    """Poll a *_status endpoint until the job reports done."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = status(job_id)
+        assert result['success'], result
+        if result['data']['done']:
+            return result['data']
+        time.sleep(0.01)
+    pytest.fail(f"job {job_id} did not finish")
+
+
+def test_job_reports_pending_then_result(api):
+    release = threading.Event()
+
+    def job():
+        release.wait(5)
+        return api._response(True, {'value': 42})
+
+    job_id = api._start_job(job)
+    assert api._job_status(job_id) == {'success': True, 'data': {'done': False}}
+
+    release.set()
+    data = wait_for_job(api._job_status, job_id)
+    assert data == {'done': True, 'success': True, 'result': {'value': 42}, 'error': None}
+
+    # A finished job is handed out once, then forgotten
+    assert api._job_status(job_id)['error'] == "Job not found"
+
+
+def test_job_exception_is_reported(api):
+    def job():
+        raise ValueError("boom")
+
+    data = wait_for_job(api._job_status, api._start_job(job))
+    assert data['success'] is False
+    assert data['error'] == "boom"
+
+
+def test_finished_job_claimed_by_one_poller(api):
+    job_id = api._start_job(lambda: api._response(True))
+    api._jobs[job_id].result(timeout=5)
+
+    outcomes = []
+    barrier = threading.Barrier(8)
+
+    def poll():
+        barrier.wait()
+        outcomes.append(api._job_status(job_id))
+
+    threads = [threading.Thread(target=poll) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [o for o in outcomes if o['success'] and o['data']['done']]
+    assert len(claimed) == 1
+    assert sum(o.get('error') == "Job not found" for o in outcomes) == 7
+
+
+def test_finished_jobs_pruned_at_limit(api, monkeypatch):
+    monkeypatch.setattr(api, 'MAX_TRACKED_JOBS', 5)
+    job_ids = [api._start_job(lambda: api._response(True)) for _ in range(5)]
+    for job_id in job_ids:
+        api._jobs[job_id].result(timeout=5)
+
+    api._start_job(lambda: api._response(True))
+
+    assert len(api._jobs) == 1
+    assert api._job_status(job_ids[0])['error'] == "Job not found"
+
+
+def test_generate_pdf_job_completes(stocked_api):
+    api = stocked_api
+    invoice = api.invoices_create([{'product_id': 'P1', 'quantity': 1}], 'cash')['data']
+
+    job_id = api.generate_pdf(invoice['id'])['data']['job_id']
+    data = wait_for_job(api.generate_pdf_status, job_id)
+
+    assert data['success'], data
+    assert Path(data['result']['path']).is_file()
+
+
+def test_checkout_auto_saves_pdf(stocked_api):
+    api = stocked_api
+    api.settings_update('auto_save_pdf', True)
+    invoice = api.invoices_create([{'product_id': 'P1', 'quantity': 1}], 'cash')['data']
+
+    assert invoice['pdf_pending'] is True
+    data = wait_for_job(api.generate_pdf_status, invoice['pdf_job_id'])
+    assert data['success'], data
+
+
+def test_email_job_records_failure_in_queue(stocked_api):
+    api = stocked_api
+    invoice = api.invoices_create([{'product_id': 'P1', 'quantity': 1}], 'cash')['data']
+
+    job_id = api.send_email(invoice['id'], 'customer@example.com')['data']['job_id']
+    data = wait_for_job(api.send_email_status, job_id)
+
+    assert data['success'] is False
+    assert data['error'] == "Email not configured"
+    rows = api.db.fetchall("SELECT status, error FROM email_queue")
+    assert [tuple(row) for row in rows] == [('failed', 'Email not configured')]
+
+
+def test_pending_email_resumed_on_startup(stocked_api):
+    from api.bridge import API
+
+    api = stocked_api
+    invoice = api.invoices_create([{'product_id': 'P1', 'quantity': 1}], 'cash')['data']
+    api.email_queue.add(invoice['id'], 'customer@example.com')
+
+    restarted = API()
+    restarted.shutdown()
+
+    assert api.email_queue.get_pending() == []
+    row = api.db.fetchone("SELECT status FROM email_queue")
+    assert row['status'] == 'failed'
+
+
+def test_queued_audit_entries_keep_event_time(db, monkeypatch):
+    audit = AuditRepository(db)
+    stamps = iter(['2025-01-15 10:30:00', '2025-01-15 10:30:01'])
+    monkeypatch.setattr('database.repositories.audit._utc_timestamp', lambda: next(stamps))
+
+    audit.log_receipt_printed('INV-2025-0001')
+    audit.log_receipt_emailed('INV-2025-0001', 'customer@example.com')
+    assert audit.flush()
+
+    entries = audit.get_by_entity(AuditRepository.ENTITY_INVOICE, 'INV-2025-0001')
+    assert sorted((e.action, e.created_at) for e in entries) == [
+        ('email', '2025-01-15 10:30:01'),
+        ('print', '2025-01-15 10:30:00'),
+    ]
+
+
+def test_audit_writer_logs_failed_batch_and_keeps_running(db, monkeypatch, caplog):
+    audit = AuditRepository(db)
+    add_batch = audit.add_batch
+    calls = []
+
+    def flaky_add_batch(entries):
+        calls.append(entries)
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        add_batch(entries)
+
+    monkeypatch.setattr(audit, 'add_batch', flaky_add_batch)
+
+    with caplog.at_level(logging.ERROR, logger='database.repositories.audit'):
+        audit.log_receipt_printed('INV-2025-0001')
+        assert audit.flush()
+        audit.log_receipt_printed('INV-2025-0002')
+        assert audit.flush()
+
+    assert "Failed to write 1 audit entries" in caplog.text
+    assert [e.entity_id for e in audit.get_recent()] == ['INV-2025-0002']
+
+
+def test_audit_flush_gives_up_when_writer_is_dead(db):
+    audit = AuditRepository(db)
+    audit._writer = threading.Thread(target=lambda: None)
+    audit._writer.start()
+    audit._writer.join()
+    audit._queue.put(('print', 'invoice', 'INV-2025-0001', None, '2025-01-15 10:30:00'))
+
+    started = time.monotonic()
+    assert audit.flush(timeout=5) is False
+    assert time.monotonic() - started < 1
@@ -0,0 +1,109 @@
+"""Repository caches must not keep values from rolled-back transactions."""
+
+import dataclasses
+
+import pytest
+
+from database.repositories.products import Product, ProductRepository
+from database.repositories.settings import SettingsRepository
+
+
+class Rollback(Exception):
+    pass
+
+
+def test_settings_set_rolled_back(db):
+    settings = SettingsRepository(db)
+    settings.set('store_name', 'Before')
+
+    with pytest.raises(Rollback):
+        with db.transaction():
+            settings.set('store_name', 'After')
+            # A read inside the transaction reloads the uncommitted value
+            assert settings.get('store_name') == 'After'
+            raise Rollback
+
+    assert settings.get('store_name') == 'Before'
+
+
+def test_settings_set_many_rolled_back(db):
+    settings = SettingsRepository(db)
+    settings.set_many({'store_name': 'Before', 'seller_id': 'S1'})
+
+    with pytest.raises(Rollback):
+        with db.transaction():
+            settings.set_many({'store_name': 'After', 'seller_id': 'S2'})
+            assert settings.get_many(['store_name', 'seller_id']) == {
+                'store_name': 'After', 'seller_id': 'S2'
+            }
+            raise Rollback
+
+    assert settings.get('store_name') == 'Before'
+    assert settings.get('seller_id') == 'S1'
+
+
+def test_settings_delete_rolled_back(db):
+    settings = SettingsRepository(db)
+    settings.set('custom_key', 'kept')
+
+    with pytest.raises(Rollback):
+        with db.transaction():
+            settings.delete('custom_key')
+            assert settings.get('custom_key') is None
+            raise Rollback
+
+    assert settings.get('custom_key') == 'kept'
+
+
+def test_settings_committed_in_transaction(db):
+    settings = SettingsRepository(db)
+
+    with db.transaction():
+        settings.set('store_name', 'Committed')
+
+    assert settings.get('store_name') == 'Committed'
+    assert SettingsRepository(db).get('store_name') == 'Committed'
+
+
+@pytest.fixture
+def products(db):
+    repository = ProductRepository(db)
+    repository.create(Product(id='P1', name='One', price=1.0, barcode='111', stock=5))
+    # Warm the cache
+    assert repository.get_by_id('P1').stock == 5
+    assert repository.get_by_barcode('111').id == 'P1'
+    return repository
+
+
+def test_product_update_rolled_back(db, products):
+    with pytest.raises(Rollback):
+        with db.transaction():
+            products.update(dataclasses.replace(products.get_by_id('P1'), name='Renamed'))
+            assert products.get_by_id('P1').name == 'Renamed'
+            raise Rollback
+
+    assert products.get_by_id('P1').name == 'One'
+    assert products.get_by_barcode('111').name == 'One'
+
+
+def test_product_stock_rolled_back(db, products):
+    with pytest.raises(Rollback):
+        with db.transaction():
+            products.update_stock_bulk({'P1': -3})
+            assert products.get_by_id('P1').stock == 2
+            raise Rollback
+
+    assert products.get_by_id('P1').stock == 5
+    assert products.get_by_ids(['P1'])['P1'].stock == 5
+
+
+def test_product_update_committed(db, products):
+    with db.transaction():
+        products.update_stock_bulk({'P1': -3})
+
+    assert products.get_by_id('P1').stock == 2
+
+
+def test_cached_product_is_immutable(products):
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        products.get_by_id('P1').stock = 0
@@ -0,0 +1,121 @@
+"""Hash chain tests: stored hashes must stay byte-compatible with the original serializer."""
+
+import hashlib
+import json
+import math
+
+import pytest
+
+from core.hash_chain import HashChain
+from database.repositories.invoices import Invoice, InvoiceItem
+
+
+def baseline_bytes(invoice_number, seller_id, total, items, timestamp, previous_hash):
+    """The hash input exactly as the first release built it with json.dumps."""
+    normalized_items = [
+        {
+            'product_id': item.get('product_id'),
+            'quantity': item.get('quantity'),
+            'unit_price': item.get('unit_price'),
+            'line_total': item.get('line_total'),
+        }
+        for item in items
+    ]
+    data = {
+        'invoice_number': invoice_number,
+        'seller_id': seller_id,
+        'total': round(total, 2),
+        'items': normalized_items,
+        'timestamp': timestamp,
+        'previous_hash': previous_hash
+    }
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+ITEM = {'product_id': 'P1', 'quantity': 2, 'unit_price': 2.5, 'line_total': 5.0}
+
+CASES = [
+    ('INV-2025-0001', 'SELLER001', 18.15, [ITEM], '2025-01-15 10:30:00', 'GENESIS'),
+    ('INV-2025-0002', 'SELLER001', 0.1 + 0.2, [], '2025-01-15 10:30:00', 'a' * 64),
+    ('INV-2025-0003', 'Séller "ñ" \\ €', 10.005, [ITEM, ITEM], 'é\n\x7f', 'GENESIS'),
+    ('INV-2025-0004', '', 1e16, [{'product_id': None, 'quantity': 10 ** 6,
+                                  'unit_price': 1e-5, 'line_total': 1e17}], '', ''),
+    ('INV-2025-0005', 'S', 0.0, [{'product_id': 'P', 'quantity': 1,
+                                  'unit_price': -0.0, 'line_total': 0}], 't', 'p'),
+    # Extra item keys are ignored; missing ones hash as null
+    ('INV-2025-0006', 'S', 5, [{'product_id': 'P', 'quantity': True, 'extra': 1}], 't', 'p'),
+    # Non-finite values fall back to the generic encoder
+    ('INV-2025-0007', 'S', 1.0, [{'product_id': 'P', 'quantity': 1,
+                                  'unit_price': math.inf, 'line_total': math.nan}], 't', 'p'),
+]
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_canonical_bytes_match_baseline(case):
+    assert HashChain.canonical_bytes(*case) == baseline_bytes(*case)
+
+
+@pytest.mark.parametrize('case', CASES)
+def test_calculate_hash_matches_baseline(case):
+    expected = hashlib.sha256(baseline_bytes(*case)).hexdigest()
+    assert HashChain.calculate_hash(*case) == expected
+
+
+def test_known_hash_vector():
+    items = [
+        {'product_id': 'P1', 'quantity': 2, 'unit_price': 2.5, 'line_total': 5.0},
+        {'product_id': 'P2', 'quantity': 1, 'unit_price': 10.0, 'line_total': 10.0},
+    ]
+    assert HashChain.calculate_hash(
+        'INV-2025-0001', 'SELLER001', 18.15, items, '2025-01-15 10:30:00', 'GENESIS'
+    ) == '653e2511a2ceb691ff42659c28fb0f60a7891909dd27b8b6ac67ef251f3a7879'
+
+
+def test_invoice_object_and_dict_hash_alike():
+    invoice = Invoice(
+        invoice_number='INV-2025-0001',
+        seller_id='SELLER001',
+        store_name='Store',
+        subtotal=15.0,
+        vat_amount=3.15,
+        total=18.15,
+        current_hash='',
+        qr_data='',
+        created_at='2025-01-15 10:30:00',
+        items=[
+            InvoiceItem(product_id='P1', product_name='One', quantity=2,
+                        unit_price=2.5, vat_rate=21.0, line_total=5.0),
+            InvoiceItem(product_id='P2', product_name='Two', quantity=1,
+                        unit_price=10.0, vat_rate=21.0, line_total=10.0),
+        ]
+    )
+    from_object = HashChain.calculate_hash_for_invoice_obj(invoice, 'GENESIS')
+    assert from_object == HashChain.calculate_hash_from_invoice(invoice.to_dict(), 'GENESIS')
+    assert from_object == '653e2511a2ceb691ff42659c28fb0f60a7891909dd27b8b6ac67ef251f3a7879'
+
+
+def test_verify_chain_detects_tampering():
+    invoices = []
+    previous_hash = HashChain.GENESIS_HASH
+    for number in range(3):
+        invoice = {
+            'id': number + 1,
+            'invoice_number': f'INV-2025-000{number + 1}',
+            'seller_id': 'SELLER001',
+            'total': 5.0,
+            'created_at': '2025-01-15 10:30:00',
+            'previous_hash': previous_hash,
+            'items': [dict(ITEM)],
+        }
+        invoice['current_hash'] = HashChain.calculate_hash_from_invoice(invoice, previous_hash)
+        previous_hash = invoice['current_hash']
+        invoices.append(invoice)
+
+    result = HashChain.verify_chain(invoices)
+    assert result.valid and result.checked_count == 3
+
+    invoices[1]['items'][0]['quantity'] = 3
+    result = HashChain.verify_chain(invoices)
+    assert not result.valid
+    assert result.failed_invoice_id == 2
+    assert result.checked_count == 1
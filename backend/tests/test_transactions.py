@@ -0,0 +1,100 @@
+"""Checkout and return writes commit or roll back as a unit."""
+
+import sqlite3
+
+import pytest
+
+from database.repositories.products import ProductRepository
+
+
+def failing_after(method):
+    """Wrap a repository method so it performs its write, then fails."""
+    def wrapper(*args, **kwargs):
+        method(*args, **kwargs)
+        raise sqlite3.OperationalError('disk I/O error')
+    return wrapper
+
+
+def count(api, table, where='1'):
+    return api.db.fetchone(f"SELECT COUNT(*) FROM {table} WHERE {where}")[0]
+
+
+def stock(api, product_id):
+    return api.db.fetchone("SELECT stock FROM products WHERE id = ?", (product_id,))[0]
+
+
+def test_create_commits_invoice_stock_and_audit(stocked_api):
+    api = stocked_api
+    result = api.invoices_create([{'product_id': 'P1', 'quantity': 3}], 'cash')
+
+    assert result['success'], result
+    assert count(api, 'invoices') == 1
+    assert stock(api, 'P1') == 7
+    assert count(api, 'audit_log', "action = 'create' AND entity_type = 'invoice'") == 1
+
+
+def test_create_rolls_back_when_stock_update_fails(stocked_api, monkeypatch):
+    api = stocked_api
+    api.invoices_create([{'product_id': 'P2', 'quantity': 1}], 'cash')
+    latest_hash = api.invoices.get_latest_hash()
+
+    monkeypatch.setattr(
+        api.products, 'update_stock_bulk', failing_after(api.products.update_stock_bulk)
+    )
+    result = api.invoices_create([{'product_id': 'P1', 'quantity': 3}], 'cash')
+
+    assert not result['success']
+    assert count(api, 'invoices') == 1
+    assert count(api, 'invoice_items') == 1
+    assert stock(api, 'P1') == 10
+    assert count(api, 'audit_log', "action = 'create' AND entity_type = 'invoice'") == 1
+    assert api.invoices.get_latest_hash() == latest_hash
+    # The cached product must not keep the rolled-back stock either
+    assert api.products.get_by_id('P1').stock == 10
+
+
+def test_return_rolls_back_when_stock_update_fails(stocked_api, monkeypatch):
+    api = stocked_api
+    created = api.invoices_create(
+        [{'product_id': 'P1', 'quantity': 2}, {'product_id': 'P2', 'quantity': 1}], 'cash'
+    )['data']
+    item_id = created['items'][0]['id']
+
+    monkeypatch.setattr(
+        api.products, 'update_stock_bulk', failing_after(api.products.update_stock_bulk)
+    )
+    result = api.invoices_process_return(created['invoice_number'], [item_id])
+
+    assert not result['success']
+    assert count(api, 'invoice_items', "return_status = 'returned'") == 0
+    assert api.invoices.get_by_number(created['invoice_number']).status == 'completed'
+    assert stock(api, 'P1') == 8
+    assert count(api, 'audit_log', "action = 'return'") == 0
+
+
+def test_return_commits_when_stock_update_succeeds(stocked_api):
+    api = stocked_api
+    created = api.invoices_create([{'product_id': 'P1', 'quantity': 2}], 'cash')['data']
+
+    result = api.invoices_process_return(created['invoice_number'], [created['items'][0]['id']])
+
+    assert result['success'], result
+    assert result['data']['new_status'] == 'returned'
+    assert stock(api, 'P1') == 10
+    assert count(api, 'audit_log', "action = 'return'") == 1
+    assert api.hash_chain_verify()['data']['valid']
+
+
+def test_nested_transaction_joins_outer_rollback(db):
+    products = ProductRepository(db)
+    db.execute(
+        "INSERT INTO products (id, name, price, stock) VALUES ('P1', 'One', 1.0, 5)"
+    )
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            with db.transaction():
+                products.update_stock_bulk({'P1': -2})
+            raise RuntimeError
+
+    assert products.get_by_id('P1').stock == 5
@@ -15,6 +15,8 @@ import type {
   PrinterStatus,
   ImportResult,
   ChainVerification,
+  JobStarted,
+  JobStatus,
 } from '@/types/api';
 import { mockApi } from './mock';
 
@@ -31,6 +33,32 @@ const getApi = () => {
   return mockApi;
 };
 
+// Poll a background job until it finishes and unwrap its result
+const JOB_POLL_INTERVAL_MS = 250;
+
+const waitForJob = async <T>(
+  started: ApiResponse<JobStarted>,
+  poll: (jobId: string) => Promise<ApiResponse<JobStatus<T>>>
+): Promise<ApiResponse<T>> => {
+  if (!started.success || !started.data) {
+    return { success: false, error: started.error };
+  }
+  for (;;) {
+    const status = await poll(started.data.job_id);
+    if (!status.success || !status.data) {
+      return { success: false, error: status.error };
+    }
+    if (status.data.done) {
+      return {
+        success: Boolean(status.data.success),
+        data: status.data.result,
+        error: status.data.error,
+      };
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
 // API wrapper with consistent interface
 export const api = {
   // Products
@@ -62,8 +90,8 @@ export const api = {
     ): Promise<ApiResponse<Invoice>> =>
       getApi().invoices_create(items, paymentMethod, customerEmail),
 
-    getByNumber: (invoiceNumber: string): Promise<ApiResponse<Invoice>> =>
-      getApi().invoices_get_by_number(invoiceNumber),
+    getByNumber: (invoiceNumber: string, clientHash?: string): Promise<ApiResponse<Invoice>> =>
+      getApi().invoices_get_by_number(invoiceNumber, clientHash),
 
     processReturn: (
       invoiceNumber: string,
@@ -85,11 +113,15 @@ export const api = {
     printReceipt: (invoiceId: number): Promise<ApiResponse<void>> =>
       getApi().print_receipt(invoiceId),
 
-    generatePdf: (invoiceId: number): Promise<ApiResponse<{ path: string }>> =>
-      getApi().generate_pdf(invoiceId),
+    generatePdf: async (invoiceId: number): Promise<ApiResponse<{ path: string }>> =>
+      waitForJob(await getApi().generate_pdf(invoiceId), (jobId) =>
+        getApi().generate_pdf_status(jobId)
+      ),
 
-    sendEmail: (invoiceId: number, email: string): Promise<ApiResponse<{ message: string }>> =>
-      getApi().send_email(invoiceId, email),
+    sendEmail: async (invoiceId: number, email: string): Promise<ApiResponse<{ message: string }>> =>
+      waitForJob(await getApi().send_email(invoiceId, email), (jobId) =>
+        getApi().send_email_status(jobId)
+      ),
   },
 
   // Settings
@@ -127,7 +159,7 @@ export const api = {
     exportCsv: (
       reportType: string,
       params?: Record<string, unknown>
-    ): Promise<ApiResponse<{ csv: string }>> => getApi().reports_export_csv(reportType, params),
+    ): Promise<ApiResponse<{ path: string }>> => getApi().reports_export_csv(reportType, params),
 
     todaySummary: (): Promise<ApiResponse<DailySales>> => getApi().reports_today_summary(),
   },
@@ -16,6 +16,8 @@ import type {
   PrinterStatus,
   ImportResult,
   ChainVerification,
+  JobStarted,
+  JobStatus,
   PyWebViewAPI,
 } from '@/types/api';
 
@@ -131,6 +133,7 @@ let mockSettings: Settings = {
   store_name: 'Demo Store',
   seller_id: 'SELLER001',
   printer_enabled: false,
+  auto_save_pdf: true,
   smtp_host: '',
   smtp_port: 587,
   smtp_username: '',
@@ -298,10 +301,16 @@ export const mockApi: PyWebViewAPI = {
     return { success: true, data: invoice };
   },
 
-  async invoices_get_by_number(invoiceNumber: string): Promise<ApiResponse<Invoice>> {
+  async invoices_get_by_number(
+    invoiceNumber: string,
+    clientHash?: string
+  ): Promise<ApiResponse<Invoice>> {
     await delay(100);
     const invoice = sampleInvoices.find((i) => i.invoice_number === invoiceNumber);
     if (invoice) {
+      if (clientHash && clientHash === invoice.current_hash) {
+        return { success: true, data: { ...invoice, qr_image: undefined, qr_unchanged: true } };
+      }
       return { success: true, data: { ...invoice, qr_image: mockQrImage } };
     }
     return { success: false, error: 'Invoice not found' };
@@ -396,14 +405,25 @@ export const mockApi: PyWebViewAPI = {
     return { success: true };
   },
 
-  async generate_pdf(_invoiceId: number): Promise<ApiResponse<{ path: string }>> {
+  async generate_pdf(_invoiceId: number): Promise<ApiResponse<JobStarted>> {
+    await delay(100);
+    return { success: true, data: { job_id: 'mock-pdf' } };
+  },
+
+  async generate_pdf_status(_jobId: string): Promise<ApiResponse<JobStatus<{ path: string }>>> {
     await delay(300);
-    return { success: true, data: { path: '/tmp/receipt.pdf' } };
+    return { success: true, data: { done: true, success: true, result: { path: '/tmp/receipt.pdf' } } };
+  },
+
+  async send_email(_invoiceId: number, email: string): Promise<ApiResponse<JobStarted>> {
+    await delay(100);
+    return { success: true, data: { job_id: `mock-email:${email}` } };
   },
 
-  async send_email(_invoiceId: number, email: string): Promise<ApiResponse<{ message: string }>> {
+  async send_email_status(jobId: string): Promise<ApiResponse<JobStatus<{ message: string }>>> {
     await delay(500);
-    return { success: true, data: { message: `Receipt sent to ${email}` } };
+    const email = jobId.replace('mock-email:', '');
+    return { success: true, data: { done: true, success: true, result: { message: `Receipt sent to ${email}` } } };
   },
 
   // Settings
@@ -514,12 +534,12 @@ export const mockApi: PyWebViewAPI = {
   async reports_export_csv(
     _reportType: string,
     _params?: Record<string, unknown>
-  ): Promise<ApiResponse<{ csv: string }>> {
+  ): Promise<ApiResponse<{ path: string }>> {
     await delay(200);
     return {
       success: true,
       data: {
-        csv: 'Date,Total Sales,Invoice Count,Average Sale\n2024-01-31,156.50,12,13.04',
+        path: `/tmp/OpenInvoice/reports/report_${_reportType}.csv`,
       },
     };
   },
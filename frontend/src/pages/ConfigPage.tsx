@@ -36,6 +36,7 @@ export default function ConfigPage() {
     currency_symbol: settings.currency_symbol,
     default_vat_rate: settings.default_vat_rate.toString(),
     printer_enabled: settings.printer_enabled,
+    auto_save_pdf: settings.auto_save_pdf,
     smtp_host: settings.smtp_host,
     smtp_port: settings.smtp_port.toString(),
     smtp_username: settings.smtp_username,
@@ -60,6 +61,7 @@ export default function ConfigPage() {
       currency_symbol: settings.currency_symbol,
       default_vat_rate: settings.default_vat_rate.toString(),
       printer_enabled: settings.printer_enabled,
+      auto_save_pdf: settings.auto_save_pdf,
       smtp_host: settings.smtp_host,
       smtp_port: settings.smtp_port.toString(),
       smtp_username: settings.smtp_username,
@@ -95,6 +97,7 @@ export default function ConfigPage() {
         currency_symbol: formData.currency_symbol,
         default_vat_rate: parseFloat(formData.default_vat_rate),
         printer_enabled: formData.printer_enabled,
+        auto_save_pdf: formData.auto_save_pdf,
         smtp_host: formData.smtp_host,
         smtp_port: parseInt(formData.smtp_port),
         smtp_username: formData.smtp_username,
@@ -280,6 +283,21 @@ export default function ConfigPage() {
               </label>
             </div>
 
+            <div className="flex items-center justify-between">
+              <p className="font-medium text-gray-900">{t('config.autoSavePdf')}</p>
+              <label className="relative inline-flex items-center cursor-pointer">
+                <input
+                  type="checkbox"
+                  checked={formData.auto_save_pdf}
+                  onChange={(e) =>
+                    setFormData({ ...formData, auto_save_pdf: e.target.checked })
+                  }
+                  className="sr-only peer"
+                />
+                <div className="w-11 h-6 bg-gray-200 peer-focus:outline-none peer-focus:ring-4 peer-focus:ring-primary/20 rounded-full peer peer-checked:after:translate-x-full peer-checked:after:border-white after:content-[''] after:absolute after:top-[2px] after:left-[2px] after:bg-white after:border-gray-300 after:border after:rounded-full after:h-5 after:w-5 after:transition-all peer-checked:bg-primary"></div>
+              </label>
+            </div>
+
             <button
               onClick={handleTestPrinter}
               disabled={testingPrinter || !formData.printer_enabled}
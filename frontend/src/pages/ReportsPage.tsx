@@ -72,15 +72,10 @@ export default function ReportsPage() {
           : { start_date: startDate, end_date: endDate };
 
       const response = await api.reports.exportCsv(reportType, params);
-      if (response.success && response.data?.csv) {
-        // Create download
-        const blob = new Blob([response.data.csv], { type: 'text/csv' });
-        const url = window.URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `report_${reportType}_${new Date().toISOString().split('T')[0]}.csv`;
-        a.click();
-        window.URL.revokeObjectURL(url);
+      if (response.success && response.data?.path) {
+        alert(`Report saved to ${response.data.path}`);
+      } else if (!response.success) {
+        alert(`Export failed: ${response.error}`);
       }
     } catch (error) {
       console.error('Export failed:', error);
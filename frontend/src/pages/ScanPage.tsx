@@ -101,9 +101,14 @@ export default function ScanPage() {
           message: `${t('scan.returnSuccess')} - ${currency}${response.data.refund_amount.toFixed(2)}`,
         });
         // Refresh invoice data
-        const refreshed = await api.invoices.getByNumber(invoice.invoice_number);
+        // Pass the hash we hold so the unchanged QR image is not sent again
+        const refreshed = await api.invoices.getByNumber(invoice.invoice_number, invoice.current_hash);
         if (refreshed.success && refreshed.data) {
-          setInvoice(refreshed.data);
+          setInvoice(
+            refreshed.data.qr_unchanged
+              ? { ...refreshed.data, qr_image: invoice.qr_image }
+              : refreshed.data
+          );
         }
         setSelectedItems([]);
       } else {
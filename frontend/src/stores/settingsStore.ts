@@ -24,6 +24,7 @@ const defaultSettings: Settings = {
   store_name: 'My Store',
   seller_id: 'SELLER001',
   printer_enabled: false,
+  auto_save_pdf: true,
   smtp_host: '',
   smtp_port: 587,
   smtp_username: '',
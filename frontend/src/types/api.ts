@@ -50,6 +50,12 @@ export interface Invoice {
   created_at: string;
   items: InvoiceItem[];
   currency_symbol?: string;
+  // Set by invoices_create: the receipt PDF is saved in the background
+  pdf_path?: string | null;
+  pdf_pending?: boolean;
+  pdf_job_id?: string;
+  // Set by invoices_get_by_number when client_hash matched: qr_image is omitted
+  qr_unchanged?: boolean;
 }
 
 // Cart types
@@ -64,6 +70,7 @@ export interface Settings {
   store_name: string;
   seller_id: string;
   printer_enabled: boolean;
+  auto_save_pdf: boolean;
   smtp_host: string;
   smtp_port: number;
   smtp_username: string;
@@ -158,6 +165,18 @@ declare global {
 }
 
 // pywebview API interface
+// Background job types
+export interface JobStarted {
+  job_id: string;
+}
+
+export interface JobStatus<T> {
+  done: boolean;
+  success?: boolean;
+  result?: T;
+  error?: string;
+}
+
 export interface PyWebViewAPI {
   // Products
   products_get_all(): Promise<ApiResponse<Product[]>>;
@@ -174,7 +193,7 @@ export interface PyWebViewAPI {
     payment_method: string,
     customer_email?: string
   ): Promise<ApiResponse<Invoice>>;
-  invoices_get_by_number(invoice_number: string): Promise<ApiResponse<Invoice>>;
+  invoices_get_by_number(invoice_number: string, client_hash?: string): Promise<ApiResponse<Invoice>>;
   invoices_process_return(
     invoice_number: string,
     item_ids: number[]
@@ -186,8 +205,10 @@ export interface PyWebViewAPI {
 
   // Printing/Export
   print_receipt(invoice_id: number): Promise<ApiResponse<void>>;
-  generate_pdf(invoice_id: number): Promise<ApiResponse<{ path: string }>>;
-  send_email(invoice_id: number, email: string): Promise<ApiResponse<{ message: string }>>;
+  generate_pdf(invoice_id: number): Promise<ApiResponse<JobStarted>>;
+  generate_pdf_status(job_id: string): Promise<ApiResponse<JobStatus<{ path: string }>>>;
+  send_email(invoice_id: number, email: string): Promise<ApiResponse<JobStarted>>;
+  send_email_status(job_id: string): Promise<ApiResponse<JobStatus<{ message: string }>>>;
 
   // Settings
   settings_get_all(): Promise<ApiResponse<Settings>>;
@@ -203,7 +224,7 @@ export interface PyWebViewAPI {
   reports_daily_sales(date: string): Promise<ApiResponse<DailySales>>;
   reports_period_sales(start_date: string, end_date: string): Promise<ApiResponse<PeriodReport>>;
   reports_top_products(limit: number): Promise<ApiResponse<TopProduct[]>>;
-  reports_export_csv(report_type: string, params?: Record<string, unknown>): Promise<ApiResponse<{ csv: string }>>;
+  reports_export_csv(report_type: string, params?: Record<string, unknown>): Promise<ApiResponse<{ path: string }>>;
   reports_today_summary(): Promise<ApiResponse<DailySales>>;
 
   // Email